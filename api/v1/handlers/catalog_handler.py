@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Request
+
+from core.config import settings
+from core.responses import conditional_response
+from services.catalog_services import CatalogServices
+
+catalog_router = APIRouter()
+
+
+@catalog_router.get("/", summary="Get the product catalog with prices", tags=["Catalog"])
+async def get_catalog(request: Request):
+    snapshot = await CatalogServices.get_snapshot()
+    # Cuerpo ya serializado y comprimido; se envía tal cual
+    return conditional_response(
+        request,
+        snapshot.body,
+        settings.CACHE_CONTROL_CATALOG,
+        etag=snapshot.etag,
+        gzip_body=snapshot.gzip_body,
+    )
+
+
+@catalog_router.get("/stats", summary="Catalog snapshot statistics", tags=["Catalog"])
+async def get_catalog_stats():
+    return CatalogServices.stats()
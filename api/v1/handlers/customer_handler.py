@@ -1,55 +1,94 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Query, Request
 
-from schemas.customer_schemas import CustomerCreate, CustomerUpdate
+from core.config import settings
+from core.errors import bad_request_on_error
+from core.projection import ExpandQuery, FieldsQuery, parse_expand, parse_fields, project, \
+    projected_response
+from core.responses import FastJSONResponse, cached_json_response
+from core.streaming import ndjson_items_response, ndjson_response
+from schemas.customer_schemas import CustomerCreate, CustomerUpdate, CustomerEmailLookup, \
+    CustomerBatchCreate, CustomerBatchUpdate, CUSTOMER_EXPANSIONS, STRIPE_CUSTOMER_FIELDS
 from services.customer_services import CustomerServices
 
 customer_router = APIRouter()
 
 
 @customer_router.get("/", summary="Get all Stripe customers", tags=["Customer"])
-async def get_all_customers():
-    try:
-        # Logic to fetch all customers from Stripe
-        result = await CustomerServices.get_stripe_all_customers()
-        return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+async def get_all_customers(
+        request: Request,
+        limit: int = Query(100, ge=1, le=100),
+        starting_after: str | None = None,
+        stream: bool = Query(False, description="Stream every customer as NDJSON"),
+        expand: ExpandQuery = None
+):
+    with bad_request_on_error():
+        expansions = parse_expand(expand, CUSTOMER_EXPANSIONS)
+        if stream:
+            return ndjson_response(CustomerServices.iter_stripe_customers(expansions))
+        # Logic to fetch a page of customers from Stripe
+        result = await CustomerServices.get_stripe_all_customers(limit, starting_after, expansions)
+        return cached_json_response(request, result, settings.CACHE_CONTROL_CUSTOMER)
 
 
 @customer_router.get("/{customer_email}", summary="Get a Stripe customer by ID", tags=["Customer"])
-async def get_customer_by_email(customer_email: str):
-    try:
+async def get_customer_by_email(
+        request: Request,
+        customer_email: str,
+        fields: FieldsQuery = None,
+        expand: ExpandQuery = None
+):
+    with bad_request_on_error():
+        expansions = parse_expand(expand, CUSTOMER_EXPANSIONS)
         # Logic to fetch a customer by ID from Stripe
-        result = await CustomerServices.get_stripe_customer_by_email(customer_email)
-        return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        result = await CustomerServices.get_stripe_customer_by_email(customer_email, expansions)
+        return projected_response(
+            result, fields, (*STRIPE_CUSTOMER_FIELDS, *expansions),
+            request, settings.CACHE_CONTROL_CUSTOMER
+        )
+
+
+@customer_router.post("/lookup", summary="Get Stripe customers by email in bulk",
+                      tags=["Customer"])
+async def get_customers_by_email(lookup_data: CustomerEmailLookup, expand: ExpandQuery = None):
+    with bad_request_on_error():
+        expansions = parse_expand(expand, CUSTOMER_EXPANSIONS)
+        result = await CustomerServices.get_stripe_customers_by_emails(
+            lookup_data.emails, expansions
+        )
+        return FastJSONResponse(result)
+
+
+@customer_router.post("/batch", summary="Create Stripe customers in bulk", tags=["Customer"])
+async def create_customers_batch(batch_data: CustomerBatchCreate):
+    # Streams one NDJSON line per item as soon as it finishes
+    return ndjson_items_response(CustomerServices.create_stripe_customers_batch(batch_data.items))
+
+
+@customer_router.patch("/batch", summary="Update Stripe customers in bulk", tags=["Customer"])
+async def update_customers_batch(batch_data: CustomerBatchUpdate):
+    # Streams one NDJSON line per item as soon as it finishes
+    return ndjson_items_response(CustomerServices.update_stripe_customers_batch(batch_data.items))
 
 
 @customer_router.post("/", summary="Create a Stripe customer", tags=["Customer"])
-async def create_customer(customer_data: CustomerCreate):
-    try:
+async def create_customer(customer_data: CustomerCreate, fields: FieldsQuery = None):
+    with bad_request_on_error():
         result = await CustomerServices.create_stripe_customer(customer_data)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        result["full_response"] = project(
+            result["full_response"], parse_fields(fields, STRIPE_CUSTOMER_FIELDS)
+        )
+        return FastJSONResponse(result)
 
 
 @customer_router.put("/{customer_id}", summary="Update a Stripe customer", tags=["Customer"])
 async def update_customer(customer_id: str, customer_data: CustomerUpdate):
-    try:
+    with bad_request_on_error():
         result = await CustomerServices.update_stripe_customer(customer_id, customer_data)
         return result
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @customer_router.delete("/{customer_id}", summary="Delete a Stripe customer", tags=["Customer"])
 async def delete_customer(customer_id: str):
-    try:
+    with bad_request_on_error():
         await CustomerServices.delete_stripe_customer(customer_id)
         return {"message": "Customer deleted successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
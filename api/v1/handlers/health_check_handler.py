@@ -1,4 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
+
+from core.cache import cache_stats
+from core.single_flight import single_flight_stats
+from services.health_services import HealthServices
+from services.rate_limiter import StripeRateLimiter
+from services.webhook_dedup import WebhookDeduplicator
+from services.webhook_queue import WebhookQueue
 
 health_check_router = APIRouter()
 
@@ -12,3 +19,46 @@ async def health_check():
     except Exception as e:
         # Manejo de errores
         return {"status": "error", "message": str(e)}
+
+
+@health_check_router.get("/live", summary="Liveness probe", tags=["Health-Check"])
+async def liveness():
+    return HealthServices.liveness()
+
+
+@health_check_router.get("/ready", summary="Readiness probe (MongoDB and Stripe)",
+                         tags=["Health-Check"])
+async def readiness(response: Response):
+    result = await HealthServices.readiness()
+    if result["status"] != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
+
+
+@health_check_router.get("/cache", summary="Catalog cache statistics", tags=["Health-Check"])
+async def get_cache_stats():
+    # Contadores de aciertos/fallos de las cachés en memoria
+    return cache_stats()
+
+
+@health_check_router.get("/webhooks", summary="Webhook queue and deduplication statistics",
+                         tags=["Health-Check"])
+async def get_webhook_stats():
+    return {
+        "queue": await WebhookQueue.backlog(),
+        "deduplication": WebhookDeduplicator.stats(),
+    }
+
+
+@health_check_router.get("/rate-limit", summary="Stripe rate limiter statistics",
+                         tags=["Health-Check"])
+async def get_rate_limit_stats():
+    # Tasa actual, peticiones en espera y 429 recibidos por bucket
+    return StripeRateLimiter.stats()
+
+
+@health_check_router.get("/single-flight", summary="Request coalescing statistics",
+                         tags=["Health-Check"])
+async def get_single_flight_stats():
+    # Lecturas a Stripe ejecutadas frente a lecturas compartidas por clave
+    return single_flight_stats()
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import render_metrics
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("", summary="Prometheus metrics", tags=["Metrics"],
+                    response_class=PlainTextResponse)
+async def get_metrics():
+    # Formato de exposición de texto de Prometheus
+    return PlainTextResponse(await render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,61 +1,75 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Query, Request
 
-from schemas.price_schemas import PriceCreate, PriceUpdate
+from core.projection import ExpandQuery, FieldsQuery, parse_expand, projected_response
+from core.config import settings
+from core.errors import bad_request_on_error
+from core.responses import cached_json_response
+from core.streaming import ndjson_response
+from schemas.price_schemas import PriceCreate, PriceUpdate, PRICE_EXPANSIONS, PRICE_FIELDS
 from services.price_services import PriceServices
 
 price_router = APIRouter()
 
 
 @price_router.get("/", summary="Get all Stripe prices.", tags=["Price"])
-async def get_all_prices():
-    try:
-        # Llama al servicio para obtener todos los precios
-        result = await PriceServices.list_prices()
-        return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+async def get_all_prices(
+        request: Request,
+        product_id: str | None = None,
+        active_only: bool = True,
+        limit: int = Query(100, ge=1, le=100),
+        starting_after: str | None = None,
+        stream: bool = Query(False, description="Stream every price as NDJSON"),
+        expand: ExpandQuery = None
+):
+    with bad_request_on_error():
+        expansions = parse_expand(expand, PRICE_EXPANSIONS)
+        if stream:
+            return ndjson_response(PriceServices.iter_prices(product_id, active_only, expansions))
+        # Llama al servicio para obtener una página de precios
+        result = await PriceServices.list_prices(
+            product_id, active_only, limit, starting_after, expansions
+        )
+        return cached_json_response(request, result, settings.CACHE_CONTROL_PRICE)
 
 
 @price_router.get("/{price_id}", summary="Get a Stripe price by ID", tags=["Price"])
-async def get_price_by_id(price_id: str):
-    try:
+async def get_price_by_id(
+        request: Request,
+        price_id: str,
+        fields: FieldsQuery = None,
+        expand: ExpandQuery = None,
+        with_product: bool = Query(False, description="Embed the product (same as expand=product)")
+):
+    with bad_request_on_error():
+        expansions = parse_expand(expand, PRICE_EXPANSIONS)
+        if with_product and "product" not in expansions:
+            expansions = tuple(sorted((*expansions, "product")))
         # Llama al servicio para obtener un precio por ID
-        result = await PriceServices.get_price_by_id(price_id)
-        return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        result = await PriceServices.get_price_by_id(price_id, expansions)
+        return projected_response(
+            result, fields, (*PRICE_FIELDS, *expansions), request, settings.CACHE_CONTROL_PRICE
+        )
 
 
 @price_router.post("/", summary="Create a Stripe price", tags=["Price"])
 async def create_price(price_data: PriceCreate):
-    try:
+    with bad_request_on_error():
         # Llama al servicio para crear un precio
         result = await PriceServices.create_price(price_data)
         return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @price_router.put("/{price_id}", summary="Update a Stripe price", tags=["Price"])
 async def update_price(price_id: str, price_data: PriceUpdate):
-    try:
+    with bad_request_on_error():
         # Llama al servicio para actualizar un precio
         result = await PriceServices.update_price(price_id, price_data)
         return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @price_router.delete("/{price_id}", summary="Delete a Stripe price", tags=["Price"])
 async def delete_price(price_id: str):
-    try:
+    with bad_request_on_error():
         # Llama al servicio para eliminar un precio
         result = await PriceServices.delete_price(price_id)
         return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
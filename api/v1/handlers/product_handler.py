@@ -1,56 +1,56 @@
-from fastapi import APIRouter, HTTPException, status
-
-from schemas.product_schemas import ProductCreate, ProductUpdate
+from fastapi import APIRouter, Query, Request
+
+from core.projection import FieldsQuery, projected_response
+from core.config import settings
+from core.errors import bad_request_on_error
+from core.responses import cached_json_response
+from core.streaming import ndjson_response
+from schemas.product_schemas import ProductCreate, ProductUpdate, PRODUCT_FIELDS
 from services.product_services import ProductServices
 
 product_router = APIRouter()
 
 
 @product_router.get("/", summary="Get all Stripe Products", tags=["Product"])
-async def get_all_products():
-    try:
-        result = await ProductServices.list_products()
-        return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+async def get_all_products(
+        request: Request,
+        active_only: bool = True,
+        limit: int = Query(100, ge=1, le=100),
+        starting_after: str | None = None,
+        stream: bool = Query(False, description="Stream every product as NDJSON")
+):
+    with bad_request_on_error():
+        if stream:
+            return ndjson_response(ProductServices.iter_products(active_only))
+        result = await ProductServices.list_products(active_only, limit, starting_after)
+        return cached_json_response(request, result, settings.CACHE_CONTROL_PRODUCT)
 
 
 @product_router.get("/{product_id}", summary="Get a Stripe Product by ID", tags=["Product"])
-async def get_product_by_id(product_id: str):
-    try:
+async def get_product_by_id(request: Request, product_id: str, fields: FieldsQuery = None):
+    with bad_request_on_error():
         result = await ProductServices.get_product_by_id(product_id)
-        return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return projected_response(
+            result, fields, PRODUCT_FIELDS, request, settings.CACHE_CONTROL_PRODUCT
+        )
 
 
 @product_router.post("/", summary="Create a Stripe Product", tags=["Product"])
 async def create_product(product_data: ProductCreate):
-    try:
+    with bad_request_on_error():
         result = await ProductServices.create_product(product_data)
         return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @product_router.put("/{product_id}", summary="Update a Stripe Product", tags=["Product"])
 async def update_product(product_id: str, product_data: ProductUpdate):
-    try:
+    with bad_request_on_error():
         result = await ProductServices.update_product(product_id, product_data)
         return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @product_router.delete("/{product_id}", summary="Delete a Stripe Product", tags=["Product"])
 async def delete_product(product_id: str):
-    try:
+    with bad_request_on_error():
         result = await ProductServices.delete_product(product_id)
         return result
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,41 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from core.config import settings
+from core.profiling import ProfileStore
+
+admin_bearer = HTTPBearer(auto_error=False)
+
+
+def require_admin_token(
+        credentials: HTTPAuthorizationCredentials | None = Depends(admin_bearer)
+) -> None:
+    # Las capturas incluyen rutas con datos de clientes (ej. emails)
+    token = settings.PROFILING_ADMIN_TOKEN
+    if not token or credentials is None or not secrets.compare_digest(
+            credentials.credentials.encode("utf-8"), token.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de administración inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+profiling_router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@profiling_router.get("/", summary="List captured slow-request profiles", tags=["Admin"])
+async def list_profiles():
+    # Capturas más recientes primero
+    return await ProfileStore.recent()
+
+
+@profiling_router.get("/{profile_id}", summary="Get a captured request profile", tags=["Admin"])
+async def get_profile(profile_id: str):
+    capture = await ProfileStore.get(profile_id)
+    if capture is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil no encontrado")
+    return capture
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Request, HTTPException, status
+from fastapi import APIRouter, Request
+
 from services.webhook_services import WebhookServices
 
 webhook_router = APIRouter()
@@ -6,9 +7,6 @@ webhook_router = APIRouter()
 
 @webhook_router.post("/", summary="Stripe Webhook", tags=["Webhook"])
 async def stripe_webhook(request: Request):
-    try:
-        # Procesa el webhook
-        return await WebhookServices.handle_webhook(request)
-    except Exception as e:
-        # Handle exceptions, e.g., log the error
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
\ No newline at end of file
+    # Sin bad_request_on_error: Stripe no reintenta los 4xx, así que solo los errores de firma
+    # o de payload responden 400 y los fallos del servidor deben llegar como 5xx
+    return await WebhookServices.handle_webhook(request)
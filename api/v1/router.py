@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from core.config import settings
+
+from api.v1.handlers import catalog_handler
 from api.v1.handlers import customer_handler
 from api.v1.handlers import payment_handler
 from api.v1.handlers import payment_method_handler
@@ -8,6 +11,8 @@ from api.v1.handlers import product_handler
 from api.v1.handlers import subscription_handler
 from api.v1.handlers import webhook_handler
 from api.v1.handlers import health_check_handler
+from api.v1.handlers import metrics_handler
+from api.v1.handlers import profiling_handler
 
 router = APIRouter()
 
@@ -17,9 +22,14 @@ router.include_router(payment_method_handler.payment_method_router, prefix="/pay
                       tags=["Payment-Method"])
 router.include_router(price_handler.price_router, prefix="/price", tags=["Price"])
 router.include_router(product_handler.product_router, prefix="/product", tags=["Product"])
+router.include_router(catalog_handler.catalog_router, prefix="/catalog", tags=["Catalog"])
 router.include_router(subscription_handler.subscription_router, prefix="/subscription",
                       tags=["Subscription"])
 router.include_router(webhook_handler.webhook_router, prefix="/webhook", tags=["Webhook"])
 router.include_router(health_check_handler.health_check_router, prefix="/health-check",
                       tags=["Health-Check"])
-
+router.include_router(metrics_handler.metrics_router, prefix="/metrics", tags=["Metrics"])
+if settings.PROFILING_ADMIN_TOKEN:
+    # Solo se exponen las capturas si hay un token de administración configurado
+    router.include_router(profiling_handler.profiling_router, prefix="/admin/profiles",
+                          tags=["Admin"])
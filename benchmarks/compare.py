@@ -0,0 +1,52 @@
+"""
+Compares two benchmark result files written by ``benchmarks/run.py``.
+
+    python -m benchmarks.compare benchmarks/results/<base>.json benchmarks/results/<head>.json
+"""
+import argparse
+import json
+from pathlib import Path
+
+METRICS = (
+    ("throughput_rps", "req/s"),
+    ("latency_ms.p50", "p50 ms"),
+    ("latency_ms.p99", "p99 ms"),
+    ("stripe_calls", "stripe calls"),
+    ("errors", "errors"),
+)
+
+
+def _value(result: dict, path: str) -> float:
+    for key in path.split("."):
+        result = result[key]
+    return result
+
+
+def _delta(base: float, head: float) -> str:
+    if base == 0:
+        return "   n/a" if head == 0 else "  +inf"
+    return f"{(head - base) / base * 100:+6.1f}%"
+
+
+def compare(base: dict, head: dict) -> list[str]:
+    lines = [f"base {base.get('commit')}  ->  head {head.get('commit')}"]
+    if base.get("config") != head.get("config"):
+        lines.append("warning: the runs used different configurations")
+    for name in sorted(set(base["scenarios"]) | set(head["scenarios"])):
+        if name not in base["scenarios"] or name not in head["scenarios"]:
+            lines.append(f"{name}: only in {'head' if name in head['scenarios'] else 'base'}")
+            continue
+        lines.append(name)
+        for path, label in METRICS:
+            before = _value(base["scenarios"][name], path)
+            after = _value(head["scenarios"][name], path)
+            lines.append(f"  {label:<13} {before:>12.2f} {after:>12.2f}  {_delta(before, after)}")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    args = parser.parse_args()
+    print("\n".join(compare(json.loads(args.base.read_text()), json.loads(args.head.read_text()))))
@@ -0,0 +1,186 @@
+"""
+Local stand-in for the Stripe API used by the benchmarks.
+
+Implements the endpoints the services call (customers, products, prices, payment intents,
+setup intents, charges, refunds, payment methods, subscriptions and balance) with in-memory
+storage, plus configurable latency and error injection:
+
+    FAKE_STRIPE_LATENCY_MS      base latency added to every request (default 0)
+    FAKE_STRIPE_JITTER_MS       uniform random extra latency (default 0)
+    FAKE_STRIPE_ERROR_RATE      fraction of requests answered with a 500 (default 0)
+    FAKE_STRIPE_RATE_LIMIT_RATE fraction of requests answered with a 429 (default 0)
+    FAKE_STRIPE_SEED            random seed, for repeatable runs (default 0)
+
+Run standalone with ``uvicorn benchmarks.fake_stripe:app --port 12111``.
+"""
+import asyncio
+import itertools
+import os
+import random
+import time
+from collections import Counter
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeStripeConfig:
+    latency_ms = float(os.getenv("FAKE_STRIPE_LATENCY_MS", 0))
+    jitter_ms = float(os.getenv("FAKE_STRIPE_JITTER_MS", 0))
+    error_rate = float(os.getenv("FAKE_STRIPE_ERROR_RATE", 0))
+    rate_limit_rate = float(os.getenv("FAKE_STRIPE_RATE_LIMIT_RATE", 0))
+    seed = int(os.getenv("FAKE_STRIPE_SEED", 0))
+
+
+# URL path segment -> Stripe object type and ID prefix
+RESOURCES = {
+    "customers": ("customer", "cus"),
+    "products": ("product", "prod"),
+    "prices": ("price", "price"),
+    "payment_intents": ("payment_intent", "pi"),
+    "setup_intents": ("setup_intent", "seti"),
+    "charges": ("charge", "ch"),
+    "refunds": ("refund", "re"),
+    "payment_methods": ("payment_method", "pm"),
+    "subscriptions": ("subscription", "sub"),
+}
+
+app = FastAPI()
+store: dict[str, dict[str, dict]] = {name: {} for name in RESOURCES}
+calls: Counter = Counter()
+_ids = itertools.count(1)
+_random = random.Random(FakeStripeConfig.seed)
+
+
+def reset() -> None:
+    """
+    Empties the store and the call counters and re-seeds the error injection.
+    """
+    global _random
+    for objects in store.values():
+        objects.clear()
+    calls.clear()
+    _random = random.Random(FakeStripeConfig.seed)
+
+
+def seed_catalog(products: int = 20, prices_per_product: int = 3, customers: int = 200) -> None:
+    """
+    Pre-populates the store so read scenarios hit existing objects.
+    """
+    for p in range(products):
+        product = _new("products", {"name": f"Product {p}", "active": True, "metadata": {}})
+        for _ in range(prices_per_product):
+            _new("prices", {
+                "product": product["id"], "active": True, "currency": "usd",
+                "unit_amount": 1000 + p, "type": "one_time", "metadata": {},
+            })
+    for c in range(customers):
+        _new("customers", {"email": f"user{c}@example.com", "name": f"User {c}", "metadata": {}})
+
+
+def _new(resource: str, fields: dict) -> dict:
+    object_type, prefix = RESOURCES[resource]
+    obj = {
+        "id": f"{prefix}_{next(_ids):08d}",
+        "object": object_type,
+        "created": int(time.time()),
+        "livemode": False,
+        "metadata": {},
+        **fields,
+    }
+    if object_type == "payment_intent":
+        obj.setdefault("status", "succeeded")
+        obj.setdefault("client_secret", f"{obj['id']}_secret")
+    store[resource][obj["id"]] = obj
+    return obj
+
+
+def _parse_form(body: bytes) -> dict:
+    """
+    Decodes Stripe's form encoding (``metadata[key]=value``) into nested dicts.
+    """
+    result: dict = {}
+    for key, value in parse_qsl(body.decode("utf-8"), keep_blank_values=True):
+        if "[" in key:
+            outer, inner = key.split("[", 1)
+            result.setdefault(outer, {})[inner.rstrip("]")] = value
+        else:
+            result[key] = _coerce(value)
+    return result
+
+
+def _coerce(value: str):
+    if value in ("true", "false"):
+        return value == "true"
+    if value.isdigit():
+        return int(value)
+    return value
+
+
+def _error(status_code: int, error_type: str, message: str, headers: dict | None = None):
+    return JSONResponse(
+        {"error": {"type": error_type, "message": message}},
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def _list(resource: str, query: dict) -> dict:
+    objects = list(store[resource].values())
+    for field in ("email", "product", "customer"):
+        if field in query:
+            objects = [o for o in objects if o.get(field) == query[field]]
+    if query.get("active") in ("true", "false"):
+        objects = [o for o in objects if o.get("active") == (query["active"] == "true")]
+    if "starting_after" in query:
+        ids = [o["id"] for o in objects]
+        start = ids.index(query["starting_after"]) + 1 if query["starting_after"] in ids else 0
+        objects = objects[start:]
+    limit = int(query.get("limit", 10))
+    return {
+        "object": "list",
+        "data": objects[:limit],
+        "has_more": len(objects) > limit,
+        "url": f"/v1/{resource}",
+    }
+
+
+@app.api_route("/v1/{path:path}", methods=["GET", "POST", "DELETE"])
+async def stripe_api(path: str, request: Request):
+    parts = path.strip("/").split("/")
+    resource = parts[0]
+    calls[f"{request.method} /v1/{resource}{'/:id' if len(parts) > 1 else ''}"] += 1
+
+    delay = FakeStripeConfig.latency_ms + _random.uniform(0, FakeStripeConfig.jitter_ms)
+    if delay:
+        await asyncio.sleep(delay / 1000)
+
+    roll = _random.random()
+    if roll < FakeStripeConfig.rate_limit_rate:
+        return _error(429, "invalid_request_error", "Too many requests", {"Retry-After": "1"})
+    if roll < FakeStripeConfig.rate_limit_rate + FakeStripeConfig.error_rate:
+        return _error(500, "api_error", "Injected failure")
+
+    if resource == "balance":
+        return {"object": "balance", "available": [], "pending": [], "livemode": False}
+    if resource not in RESOURCES:
+        return _error(404, "invalid_request_error", f"Unrecognized request URL: /v1/{path}")
+
+    query = dict(request.query_params)
+    form = _parse_form(await request.body())
+
+    if len(parts) == 1:
+        if request.method == "GET":
+            return _list(resource, query)
+        return _new(resource, form)
+
+    obj = store[resource].get(parts[1])
+    if obj is None:
+        return _error(404, "invalid_request_error", f"No such {RESOURCES[resource][0]}: {parts[1]}")
+    if request.method == "DELETE":
+        del store[resource][parts[1]]
+        return {"id": obj["id"], "object": obj["object"], "deleted": True}
+    if request.method == "POST" and len(parts) == 2:
+        obj.update(form)
+    return obj
@@ -0,0 +1,334 @@
+"""
+Throughput and latency benchmarks for the API routers.
+
+Starts the FastAPI ``app`` from ``main.py`` in-process (with its lifespan) against the local
+fake Stripe server (``benchmarks/fake_stripe.py``) and an in-memory Mongo stand-in
+(mongomock-motor), runs each scenario with a fixed number of requests and concurrency, and
+writes the results as JSON so runs can be compared between commits with
+``benchmarks/compare.py``.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --scenarios price product --requests 2000 --concurrency 100
+    python -m benchmarks.run --latency-ms 80 --jitter-ms 40 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+import uvicorn
+
+ROOT = Path(__file__).resolve().parent.parent
+WEBHOOK_SECRET = "whsec_benchmark"
+
+# Settings required by core.config, for runs without a .env file
+DEFAULT_ENV = {
+    "DATABASE_URL": "mongodb://localhost:27017",
+    "DATABASE_NAME": "stripe_api_benchmark",
+    "PROJECT_NAME": "stripe-api-benchmark",
+    "API_V1_STR": "/api/v1",
+    "SECRET_KEY": "benchmark",
+    "ALGORITHM": "HS256",
+    "JWT_SECRET_KEY": "benchmark",
+    "JWT_REFRESH_SECRET_KEY": "benchmark",
+    "STRIPE_SECRET_KEY": "sk_test_benchmark",
+    "STRIPE_PUBLISHABLE_KEY": "pk_test_benchmark",
+    "STRIPE_WEBHOOK_SECRET": WEBHOOK_SECRET,
+    "FRONTEND_URL": "http://localhost:3000",
+    "EVENT_LOG_LEVEL": "WARNING",
+}
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+class Scenario:
+    def __init__(self, name: str, request: Request, setup: Callable[[], None] | None = None):
+        self.name = name
+        self.request = request
+        self.setup = setup
+
+
+def _sign(payload: str) -> str:
+    timestamp = int(time.time())
+    signature = hmac.new(
+        WEBHOOK_SECRET.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def _webhook_event(i: int) -> str:
+    event_type = ("product.updated", "price.updated", "invoice.paid", "charge.succeeded")[i % 4]
+    object_type = event_type.split(".")[0]
+    return json.dumps({
+        "id": f"evt_bench_{i:08d}_{time.time_ns()}",
+        "object": "event",
+        "type": event_type,
+        "created": int(time.time()),
+        "data": {"object": {"id": f"{object_type}_bench_{i % 50}", "object": object_type}},
+    })
+
+
+async def _post_webhook(client: httpx.AsyncClient, i: int) -> httpx.Response:
+    payload = _webhook_event(i)
+    return await client.post("/webhook/", content=payload,
+                             headers={"Stripe-Signature": _sign(payload)})
+
+
+def build_scenarios(fake_stripe) -> list[Scenario]:
+    def ids(resource: str) -> list[str]:
+        return list(fake_stripe.store[resource])
+
+    def pick(resource: str, i: int, hot: int = 10) -> str:
+        # A small hot set, as in a product launch where a few items get most of the traffic
+        return ids(resource)[i % hot]
+
+    def seed_payment_intents() -> None:
+        for i in range(20):
+            fake_stripe._new("payment_intents", {"amount": 1000 + i, "currency": "usd"})
+
+    return [
+        Scenario("customer.list", lambda c, i: c.get("/customer/", params={"limit": 100})),
+        Scenario("customer.get_by_email",
+                 lambda c, i: c.get(f"/customer/user{i % 200}@example.com")),
+        Scenario("customer.create", lambda c, i: c.post("/customer/", json={
+            "email": f"bench{i}-{time.time_ns()}@example.com", "name": f"Bench {i}",
+        })),
+        Scenario("payment.create_intent", lambda c, i: c.post(
+            "/payment/payment-intent",
+            json={"amount": 1000 + i, "currency": "usd", "payment_method": "pm_card_visa"},
+            headers={"Idempotency-Key": f"bench-{i}-{time.time_ns()}"},
+        )),
+        Scenario("payment.get_intent",
+                 lambda c, i: c.get(f"/payment/payment-intent/{pick('payment_intents', i)}"),
+                 setup=seed_payment_intents),
+        Scenario("price.get", lambda c, i: c.get(f"/price/{pick('prices', i)}")),
+        Scenario("price.list", lambda c, i: c.get("/price/", params={"limit": 50})),
+        Scenario("product.get", lambda c, i: c.get(f"/product/{pick('products', i)}")),
+        Scenario("product.list", lambda c, i: c.get("/product/", params={"limit": 50})),
+        Scenario("webhook.burst", _post_webhook),
+    ]
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_scenario(
+        client: httpx.AsyncClient,
+        scenario: Scenario,
+        total: int,
+        concurrency: int,
+        fake_stripe
+) -> dict[str, Any]:
+    if scenario.setup is not None:
+        scenario.setup()
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    counter = iter(range(total))
+    stripe_calls_before = sum(fake_stripe.calls.values())
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await scenario.request(client, i)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+
+    result: dict[str, Any] = {}
+    if scenario.name.startswith("webhook."):
+        result["drain_seconds"] = await _drain_webhooks()
+        duration_with_drain = duration + result["drain_seconds"]
+        result["processed_per_second"] = total / duration_with_drain if duration_with_drain else 0
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_counts": dict(statuses),
+        "duration_seconds": duration,
+        "throughput_rps": total / duration if duration else 0.0,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+            "p50": _percentile(latencies, 0.50) * 1000,
+            "p90": _percentile(latencies, 0.90) * 1000,
+            "p99": _percentile(latencies, 0.99) * 1000,
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+        },
+        "stripe_calls": sum(fake_stripe.calls.values()) - stripe_calls_before,
+        **result,
+    }
+
+
+async def _drain_webhooks(timeout: float = 120.0) -> float:
+    from services.webhook_queue import WebhookQueue
+
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        backlog = await WebhookQueue.backlog()
+        if backlog["pending"] == 0 and backlog["processing"] == 0:
+            break
+        await asyncio.sleep(0.05)
+    return time.perf_counter() - start
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_stripe(fake_stripe, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(
+        fake_stripe.app, host="127.0.0.1", port=port, log_level="warning", access_log=False
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> dict[str, Any]:
+    from benchmarks import fake_stripe
+
+    fake_stripe.FakeStripeConfig.latency_ms = args.latency_ms
+    fake_stripe.FakeStripeConfig.jitter_ms = args.jitter_ms
+    fake_stripe.FakeStripeConfig.error_rate = args.error_rate
+    fake_stripe.FakeStripeConfig.rate_limit_rate = args.rate_limit_rate
+    fake_stripe.FakeStripeConfig.seed = args.seed
+    fake_stripe.reset()
+    fake_stripe.seed_catalog()
+
+    port = _free_port()
+    server = start_fake_stripe(fake_stripe, port)
+    os.environ["STRIPE_API_BASE"] = f"http://127.0.0.1:{port}"
+    for key, value in DEFAULT_ENV.items():
+        os.environ.setdefault(key, value)
+
+    if not args.mongo_url:
+        # In-memory Mongo stand-in
+        import mongomock_motor
+        import dependencies.database
+        dependencies.database.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    else:
+        os.environ["DATABASE_URL"] = args.mongo_url
+
+    from core.config import settings
+    from main import app
+
+    scenarios = [s for s in build_scenarios(fake_stripe)
+                 if not args.scenarios or any(s.name.startswith(p) for p in args.scenarios)]
+    results: dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                    transport=transport,
+                    base_url=f"http://benchmark{settings.API_V1_STR}",
+                    timeout=60.0,
+            ) as client:
+                for scenario in scenarios:
+                    # Warm-up requests are not measured
+                    for i in range(min(args.warmup, args.requests)):
+                        await scenario.request(client, i)
+                    results[scenario.name] = await run_scenario(
+                        client, scenario, args.requests, args.concurrency, fake_stripe
+                    )
+                    print(_summary_line(scenario.name, results[scenario.name]), file=sys.stderr)
+    finally:
+        server.should_exit = True
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+            "seed": args.seed,
+            "mongo": "real" if args.mongo_url else "mongomock",
+        },
+        "scenarios": results,
+    }
+
+
+def _summary_line(name: str, result: dict[str, Any]) -> str:
+    latency = result["latency_ms"]
+    return (f"{name:<24} {result['throughput_rps']:>9.1f} req/s  "
+            f"p50 {latency['p50']:>7.2f} ms  p99 {latency['p99']:>7.2f} ms  "
+            f"errors {result['errors']:>5}  stripe calls {result['stripe_calls']:>6}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", nargs="*", default=[],
+                        help="Scenario name prefixes (e.g. 'price', 'customer.create')")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests")
+    parser.add_argument("--latency-ms", type=float, default=20.0,
+                        help="Fake Stripe base latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of Stripe calls answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction of Stripe calls answered with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mongo-url", default=None,
+                        help="Use a real MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Results file (default: benchmarks/results/<commit>.json)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = asyncio.run(main(arguments))
+    output = arguments.output or (
+        ROOT / "benchmarks" / "results" / f"{report['commit'] or int(report['timestamp'])}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
@@ -0,0 +1,139 @@
+"""
+Micro-benchmark of response encoding for typical customer, price and payment-intent payloads.
+
+Compares FastAPI's default path (``jsonable_encoder`` + ``json.dumps``, as done by
+``JSONResponse``), plain ``json.dumps`` and ``core.fast_json.dumps`` (used by
+``FastJSONResponse``), for a single object and for a 100-object list page.
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --number 5000 --output /tmp/serialization.json
+"""
+import argparse
+import json
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+
+import stripe
+from fastapi.encoders import jsonable_encoder
+
+from core import fast_json
+
+
+def _customer(i: int) -> dict[str, Any]:
+    return {
+        "id": f"cus_{i:014d}", "object": "customer", "address": None, "balance": 0,
+        "created": 1700000000 + i, "currency": "usd", "default_source": None,
+        "delinquent": False, "description": None, "discount": None,
+        "email": f"user{i}@example.com", "invoice_prefix": f"ABC{i:04d}",
+        "invoice_settings": {"custom_fields": None, "default_payment_method": f"pm_{i:014d}",
+                             "footer": None, "rendering_options": None},
+        "livemode": False, "metadata": {"plan": "pro", "source": "mobile"},
+        "name": f"User {i}", "next_invoice_sequence": 1, "phone": "+15555550100",
+        "preferred_locales": ["es"], "shipping": None, "tax_exempt": "none",
+        "test_clock": None,
+    }
+
+
+def _price(i: int) -> dict[str, Any]:
+    return {
+        "id": f"price_{i:014d}", "object": "price", "active": True, "billing_scheme": "per_unit",
+        "created": 1700000000 + i, "currency": "usd", "custom_unit_amount": None,
+        "livemode": False, "lookup_key": None, "metadata": {"tier": "standard"},
+        "nickname": None, "product": f"prod_{i // 3:014d}",
+        "recurring": {"aggregate_usage": None, "interval": "month", "interval_count": 1,
+                      "meter": None, "trial_period_days": None, "usage_type": "licensed"},
+        "tax_behavior": "unspecified", "tiers_mode": None, "transform_quantity": None,
+        "type": "recurring", "unit_amount": 1999, "unit_amount_decimal": "1999",
+    }
+
+
+def _payment_intent(i: int) -> dict[str, Any]:
+    return {
+        "id": f"pi_{i:014d}", "object": "payment_intent", "amount": 1999 + i,
+        "amount_capturable": 0, "amount_received": 1999 + i,
+        "automatic_payment_methods": {"allow_redirects": "always", "enabled": True},
+        "canceled_at": None, "cancellation_reason": None, "capture_method": "automatic",
+        "client_secret": f"pi_{i:014d}_secret_abcdefghijklmnop", "confirmation_method": "automatic",
+        "created": 1700000000 + i, "currency": "usd", "customer": f"cus_{i:014d}",
+        "description": "Checkout", "last_payment_error": None,
+        "latest_charge": f"ch_{i:014d}", "livemode": False, "metadata": {"order_id": str(i)},
+        "next_action": None, "on_behalf_of": None, "payment_method": f"pm_{i:014d}",
+        "payment_method_options": {"card": {"installments": None, "mandate_options": None,
+                                            "network": None,
+                                            "request_three_d_secure": "automatic"}},
+        "payment_method_types": ["card"], "receipt_email": f"user{i}@example.com",
+        "setup_future_usage": None, "shipping": None, "status": "succeeded",
+        "transfer_data": None, "transfer_group": None,
+    }
+
+
+PAYLOADS = {
+    "customer": _customer,
+    "price": _price,
+    "payment_intent": _payment_intent,
+}
+
+ENCODERS: dict[str, Callable[[Any], bytes]] = {
+    "jsonable_encoder+json": lambda obj: json.dumps(
+        jsonable_encoder(obj), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8"),
+    "json": lambda obj: json.dumps(obj, separators=(",", ":")).encode("utf-8"),
+    "fast_json": fast_json.dumps,
+}
+
+
+def _stripe_object(data: dict[str, Any]) -> stripe.StripeObject:
+    # Same nested StripeObject tree that the SDK returns
+    return stripe.StripeObject.construct_from(data, "sk_test_benchmark")
+
+
+def run(number: int, repeat: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name, build in PAYLOADS.items():
+        shapes = {
+            "object": _stripe_object(build(0)),
+            "page_100": {"object": "list", "has_more": True,
+                         "items": [_stripe_object(build(i)) for i in range(100)]},
+        }
+        for shape, payload in shapes.items():
+            key = f"{name}.{shape}"
+            iterations = number if shape == "object" else max(1, number // 100)
+            results[key] = {}
+            for encoder_name, encode in ENCODERS.items():
+                best = min(timeit.repeat(lambda: encode(payload), number=iterations,
+                                         repeat=repeat))
+                results[key][encoder_name] = {
+                    "us_per_op": best / iterations * 1e6,
+                    "bytes": len(encode(payload)),
+                }
+            baseline = results[key]["jsonable_encoder+json"]["us_per_op"]
+            for encoder_name in ENCODERS:
+                entry = results[key][encoder_name]
+                entry["speedup"] = baseline / entry["us_per_op"] if entry["us_per_op"] else 0.0
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=2000, help="Encodes per measurement")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = {
+        "timestamp": time.time(),
+        "orjson": fast_json.orjson is not None,
+        "results": run(arguments.number, arguments.repeat),
+    }
+    for payload, encoders in report["results"].items():
+        for encoder_name, entry in encoders.items():
+            print(f"{payload:<24} {encoder_name:<22} {entry['us_per_op']:>10.2f} us  "
+                  f"{entry['bytes']:>7} B  x{entry['speedup']:.1f}", file=sys.stderr)
+    if arguments.output:
+        arguments.output.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,99 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_caches: dict[str, "TTLCache"] = {}
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    In-process LRU cache with per-entry TTL and size-based eviction.
+
+    Read-through callers take ``generation(key)`` before fetching and pass it to ``set``:
+    if ``invalidate``, ``delete_where`` or ``clear`` ran while the fetch was in flight, the
+    stale value is not written back.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_writes = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._epoch = 0
+        self._generations: dict[Hashable, int] = {}
+        _caches[name] = self
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def generation(self, key: Hashable) -> tuple[int, int]:
+        return self._epoch, self._generations.get(key, 0)
+
+    def set(
+            self,
+            key: Hashable,
+            value: Any,
+            generation: tuple[int, int] | None = None,
+            generation_key: Hashable = None
+    ) -> None:
+        # generation_key: key whose invalidation also drops this entry (defaults to key)
+        if generation is not None and generation != self.generation(
+                key if generation_key is None else generation_key):
+            # Invalidated while the value was being fetched
+            self.stale_writes += 1
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        if len(self._generations) >= self.max_entries:
+            self._generations.clear()
+            self._epoch += 1
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        for key in [k for k, (_, value) in self._entries.items() if predicate(k, value)]:
+            del self._entries[key]
+        self._epoch += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._epoch += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_writes": self.stale_writes,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
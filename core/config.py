@@ -4,6 +4,12 @@ from pydantic.v1 import BaseSettings
 class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_NAME: str
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_IDLE_TIME_MS: int = 5 * 60 * 1000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_COMPRESSORS: str = ""  # ej. 'zstd,snappy,zlib'; vacío desactiva la compresión
+    MONGO_READ_PREFERENCE: str = "primary"
     PROJECT_NAME: str
     API_V1_STR: str
     SECRET_KEY: str
@@ -13,9 +19,64 @@ class Settings(BaseSettings):
     STRIPE_SECRET_KEY: str
     STRIPE_PUBLISHABLE_KEY: str
     STRIPE_WEBHOOK_SECRET: str
+    STRIPE_API_BASE: str | None = None  # ej. un servidor local que simula Stripe
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
     FRONTEND_URL: str
+    STRIPE_MAX_CONCURRENCY: int = 200
+    STRIPE_POOL_MAX_CONNECTIONS: int = 100
+    STRIPE_POOL_MAX_KEEPALIVE: int = 50
+    STRIPE_KEEPALIVE_EXPIRY: float = 60.0
+    STRIPE_CONNECT_TIMEOUT: float = 5.0
+    STRIPE_READ_TIMEOUT: float = 30.0
+    STRIPE_HTTP2: bool = False
+    STRIPE_READ_RATE_PER_SECOND: float = 80.0
+    STRIPE_WRITE_RATE_PER_SECOND: float = 80.0
+    STRIPE_RATE_BURST_SECONDS: float = 1.0
+    STRIPE_RATE_LIMIT_MIN_FACTOR: float = 0.1
+    STRIPE_RATE_LIMIT_MAX_RETRIES: int = 3
+    STRIPE_RATE_LIMIT_BACKEND: str = "local"  # 'local' o 'mongo'
+    STRIPE_MAX_RETRIES: int = 3
+    STRIPE_RETRY_BASE_SECONDS: float = 0.25
+    STRIPE_RETRY_MAX_SECONDS: float = 4.0
+    IDEMPOTENCY_CACHE_TTL_SECONDS: float = 60 * 60 * 24
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = 10000
+    CATALOG_CACHE_TTL_SECONDS: float = 300.0
+    CATALOG_CACHE_MAX_ENTRIES: int = 1024
+    CATALOG_SNAPSHOT_TTL_SECONDS: float = 900.0
+    CATALOG_PATCH_DEBOUNCE_SECONDS: float = 0.5
+    CACHE_CONTROL_CATALOG: str = "public, max-age=60"
+    CACHE_CONTROL_PRODUCT: str = "public, max-age=60"
+    CACHE_CONTROL_PRICE: str = "public, max-age=60"
+    CACHE_CONTROL_CUSTOMER: str = "private, no-cache"
+    SINGLE_FLIGHT_WINDOW_SECONDS: float = 0.1
+    MIRROR_READS_ENABLED: bool = False
+    CUSTOMER_BATCH_CONCURRENCY: int = 16
+    WEBHOOK_WORKERS: int = 64
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BASE_SECONDS: float = 2.0
+    WEBHOOK_RETRY_MAX_SECONDS: float = 600.0
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = 1.0
+    WEBHOOK_LEASE_SECONDS: float = 300.0
+    WEBHOOK_DEDUP_MEMORY_ENTRIES: int = 10000
+    WEBHOOK_DEDUP_TTL_SECONDS: int = 60 * 60 * 24 * 7
+    WEBHOOK_TOLERANCE_SECONDS: int = 300
+    WEBHOOK_OFFLOAD_BYTES: int = 64 * 1024
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    HEALTH_PROBE_CACHE_SECONDS: float = 5.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_MAX_LOOP_LAG_SECONDS: float = 1.0
+    PROFILING_HEADER_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_THRESHOLD_SECONDS: float = 1.0
+    PROFILING_CPROFILE: bool = False
+    PROFILING_DIR: str = "/tmp/stripe-api-profiles"
+    PROFILING_MAX_CAPTURES: int = 200
+    # Token de las rutas /admin/profiles (Authorization: Bearer); sin él no se montan
+    PROFILING_ADMIN_TOKEN: str | None = None
+    EVENT_LOG_LEVEL: str = "INFO"
+    EVENT_LOG_SAMPLE_RATE: float = 1.0
+    EVENT_LOG_BUFFER_SIZE: int = 10000
 
     class Config:
         env_file = ".env"
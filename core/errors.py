@@ -0,0 +1,21 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+import stripe
+from fastapi import HTTPException, status
+
+
+@contextmanager
+def bad_request_on_error() -> Iterator[None]:
+    """
+    Maps any error raised by a route to 400 Bad Request with the error message.
+
+    ``HTTPException`` passes through unchanged, and so does Stripe's ``RateLimitError``,
+    which the app-level handler in ``main.py`` turns into 429 with ``Retry-After``.
+    """
+    try:
+        yield
+    except (HTTPException, stripe.error.RateLimitError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
@@ -0,0 +1,73 @@
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+from core.config import settings
+
+event_logger = logging.getLogger("stripe_api.events")
+event_logger.setLevel(settings.EVENT_LOG_LEVEL)
+event_logger.propagate = False
+
+_buffer: queue.Queue = queue.Queue(maxsize=settings.EVENT_LOG_BUFFER_SIZE)
+_listener: QueueListener | None = None
+dropped_records = 0
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "event": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class _DroppingQueueHandler(QueueHandler):
+    # Never block the event loop: when the buffer is full the record is dropped.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global dropped_records
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_records += 1
+
+
+event_logger.addHandler(_DroppingQueueHandler(_buffer))
+
+
+def start_event_logging() -> None:
+    global _listener
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_JsonFormatter())
+    _listener = QueueListener(_buffer, stream_handler)
+    _listener.start()
+
+
+def stop_event_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_event(level: int, event: str, **fields: Any) -> None:
+    """
+    Log a structured event without blocking the event loop.
+
+    Events below WARNING are sampled with EVENT_LOG_SAMPLE_RATE.
+    """
+    if not event_logger.isEnabledFor(level):
+        return
+    if level < logging.WARNING and random.random() >= settings.EVENT_LOG_SAMPLE_RATE:
+        return
+    event_logger.log(level, event, extra={"fields": fields})
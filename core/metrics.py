@@ -0,0 +1,256 @@
+import asyncio
+import inspect
+import math
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+from core.cache import cache_stats
+from core.config import settings
+from core.single_flight import single_flight_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics: list["_Metric"] = []
+Collector = Callable[[], Iterable[str] | Awaitable[Iterable[str]]]
+
+_collectors: list[Collector] = []
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _metrics.append(self)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Iterable[str] = (),
+            buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # labels -> [conteo por bucket..., suma, total]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for labels, series in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _labels(self.labelnames, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, inf)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+def register_collector(collector: Collector) -> None:
+    """
+    Registers a function that renders extra samples (in text format) at scrape time. It may
+    be a coroutine function when the samples need I/O (e.g. counting documents in MongoDB).
+    """
+    _collectors.append(collector)
+
+
+def render_family(
+        name: str,
+        kind: str,
+        documentation: str,
+        samples: Iterable[tuple[dict[str, str], float]]
+) -> list[str]:
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(
+            f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}"
+        )
+    return lines
+
+
+def _cache_samples() -> list[str]:
+    caches = cache_stats()
+    flights = single_flight_stats()
+    return [
+        *render_family("cache_hits_total", "counter", "In-process cache hits.",
+                       (({"cache": name}, s["hits"]) for name, s in caches.items())),
+        *render_family("cache_misses_total", "counter", "In-process cache misses.",
+                       (({"cache": name}, s["misses"]) for name, s in caches.items())),
+        *render_family("cache_hit_ratio", "gauge", "In-process cache hit ratio.",
+                       (({"cache": name}, s["hit_ratio"]) for name, s in caches.items())),
+        *render_family("cache_entries", "gauge", "In-process cache size.",
+                       (({"cache": name}, s["entries"]) for name, s in caches.items())),
+        *render_family("single_flight_calls_total", "counter", "Coalesced reads executed.",
+                       (({"group": name}, s["calls"]) for name, s in flights.items())),
+        *render_family("single_flight_shared_total", "counter",
+                       "Reads served by an in-flight or recent call.",
+                       (({"group": name}, s["shared"]) for name, s in flights.items())),
+    ]
+
+
+_collectors.append(_cache_samples)
+
+
+async def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        samples = collector()
+        if inspect.isawaitable(samples):
+            samples = await samples
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route", "status"),
+)
+http_exceptions = Counter(
+    "http_exceptions_total", "Unhandled exceptions raised by route handlers.",
+    ("route", "error"),
+)
+stripe_call_duration = Histogram(
+    "stripe_call_duration_seconds", "Latency of Stripe API calls by resource and method.",
+    ("call", "outcome"),
+)
+stripe_errors = Counter(
+    "stripe_errors_total", "Stripe API errors by resource, method and error class.",
+    ("call", "error"),
+)
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds", "Event loop scheduling delay.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that records request latency labeled by the matched route template
+    (e.g. '/api/v1/price/{price_id}'), keeping label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            http_exceptions.inc(_route(scope), type(e).__name__)
+            raise
+        finally:
+            http_request_duration.observe(
+                scope["method"], _route(scope), str(status_code),
+                value=time.perf_counter() - start,
+            )
+
+
+def _route(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up a task that sleeps for a fixed interval.
+    """
+
+    last_lag = 0.0
+    _task: asyncio.Task | None = None
+
+    @staticmethod
+    def start() -> None:
+        if LoopLagMonitor._task is None:
+            LoopLagMonitor._task = asyncio.create_task(LoopLagMonitor._run())
+
+    @staticmethod
+    async def stop() -> None:
+        task, LoopLagMonitor._task = LoopLagMonitor._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    @staticmethod
+    async def _run() -> None:
+        interval = settings.LOOP_LAG_INTERVAL_SECONDS
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            LoopLagMonitor.last_lag = max(0.0, time.perf_counter() - start - interval)
+            event_loop_lag.observe(value=LoopLagMonitor.last_lag)
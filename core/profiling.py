@@ -0,0 +1,229 @@
+import asyncio
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+from core.config import settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+class Profile:
+    """
+    Span timeline of a single request.
+    """
+
+    def __init__(self, profile_id: str, method: str, path: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans: list[dict[str, Any]] = []
+
+    def to_dict(self, duration: float, status_code: int, cprofile: str | None) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": status_code,
+            "started_at": self.started_at,
+            "duration_seconds": duration,
+            "spans": sorted(self.spans, key=lambda s: s["start_seconds"]),
+            "cprofile": cprofile,
+        }
+
+
+_current: ContextVar[Profile | None] = ContextVar("profile", default=None)
+# Nesting level of the active span; per task, so concurrent spans do not mix
+_depth: ContextVar[int] = ContextVar("profile_depth", default=0)
+
+
+@asynccontextmanager
+async def span(name: str) -> AsyncIterator[None]:
+    """
+    Records a span in the current request's profile; a no-op when it is not profiled.
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _depth.reset(token)
+        profile.spans.append({
+            "name": name,
+            "depth": depth,
+            "start_seconds": start - profile.start,
+            "duration_seconds": time.perf_counter() - start,
+            "error": error,
+        })
+
+
+def profiled(cls):
+    """
+    Class decorator: wraps every coroutine static method in a span named 'Class.method'.
+    """
+    for attr, value in list(vars(cls).items()):
+        if isinstance(value, staticmethod) and inspect.iscoroutinefunction(value.__func__):
+            setattr(cls, attr, staticmethod(_traced(f"{cls.__name__}.{attr}", value.__func__)))
+    return cls
+
+
+def _traced(name: str, fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return await fn(*args, **kwargs)
+        async with span(name):
+            return await fn(*args, **kwargs)
+    return wrapper
+
+
+class ProfileStore:
+    """
+    Bounded on-disk ring buffer of slow-request captures (one JSON file per capture).
+    """
+
+    @staticmethod
+    async def save(capture: dict[str, Any]) -> None:
+        await asyncio.to_thread(ProfileStore._write, capture)
+
+    @staticmethod
+    def _write(capture: dict[str, Any]) -> None:
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        name = f"{time.time_ns()}-{capture['id']}.json"
+        with open(os.path.join(settings.PROFILING_DIR, name), "w") as f:
+            json.dump(capture, f, default=str)
+        for old in ProfileStore._files()[:-settings.PROFILING_MAX_CAPTURES]:
+            try:
+                os.remove(os.path.join(settings.PROFILING_DIR, old))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _files() -> list[str]:
+        try:
+            return sorted(f for f in os.listdir(settings.PROFILING_DIR) if f.endswith(".json"))
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    async def recent() -> list[dict[str, Any]]:
+        return await asyncio.to_thread(ProfileStore._summaries)
+
+    @staticmethod
+    def _summaries() -> list[dict[str, Any]]:
+        summaries = []
+        for name in reversed(ProfileStore._files()):
+            capture = ProfileStore._read(name)
+            if capture is not None:
+                summaries.append({key: capture[key] for key in
+                                  ("id", "method", "path", "status", "started_at",
+                                   "duration_seconds")})
+        return summaries
+
+    @staticmethod
+    async def get(profile_id: str) -> dict[str, Any] | None:
+        return await asyncio.to_thread(ProfileStore._find, profile_id)
+
+    @staticmethod
+    def _find(profile_id: str) -> dict[str, Any] | None:
+        for name in ProfileStore._files():
+            if name.endswith(f"-{profile_id}.json"):
+                return ProfileStore._read(name)
+        return None
+
+    @staticmethod
+    def _read(name: str) -> dict[str, Any] | None:
+        try:
+            with open(os.path.join(settings.PROFILING_DIR, name)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in request profiling: a request is profiled when it sends ``X-Profile: 1`` (if
+    PROFILING_HEADER_ENABLED) or is sampled with PROFILING_SAMPLE_RATE. Sampled requests are
+    stored only above PROFILING_THRESHOLD_SECONDS; requests profiled by header are always
+    stored and get an ``X-Profile-Id`` response header.
+
+    With PROFILING_CPROFILE the capture also includes cProfile output. cProfile covers the
+    whole thread, so other requests running concurrently show up in it, and only one request
+    at a time is profiled with it.
+    """
+
+    _cprofile_busy = False
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        forced = (settings.PROFILING_HEADER_ENABLED
+                  and dict(scope["headers"]).get(PROFILE_HEADER) in (b"1", b"true"))
+        if not forced and random.random() >= settings.PROFILING_SAMPLE_RATE:
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(uuid4().hex, scope["method"], scope["path"])
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if forced:
+                    message["headers"] = [*message.get("headers", []),
+                                          (PROFILE_ID_HEADER, profile.id.encode())]
+            await send(message)
+
+        profiler = None
+        if settings.PROFILING_CPROFILE and not ProfilingMiddleware._cprofile_busy:
+            ProfilingMiddleware._cprofile_busy = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        token = _current.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            duration = time.perf_counter() - profile.start
+            cprofile_output = None
+            if profiler is not None:
+                profiler.disable()
+                ProfilingMiddleware._cprofile_busy = False
+                cprofile_output = _format_stats(profiler)
+            if forced or duration >= settings.PROFILING_THRESHOLD_SECONDS:
+                await ProfileStore.save(profile.to_dict(duration, status_code, cprofile_output))
+
+
+def _format_stats(profiler: cProfile.Profile) -> str:
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(50)
+    return output.getvalue()
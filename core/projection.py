@@ -0,0 +1,98 @@
+import re
+from typing import Annotated, Any
+
+from fastapi import Query, Request, Response
+
+from core.responses import FastJSONResponse, cached_json_response
+
+ALL_FIELDS = "*"
+_FIELD = re.compile(r"^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$")
+
+ExpandQuery = Annotated[list[str] | None, Query(
+    description="Related objects to expand in the same Stripe request (repeat the parameter "
+                "or separate with commas). Only the expansions allowed by the route are accepted.",
+)]
+
+FieldsQuery = Annotated[str | None, Query(
+    description="Comma-separated fields to return (dotted paths for nested fields), "
+                "or '*' for the full object. Defaults to the route's response schema.",
+)]
+
+
+def parse_fields(fields: str | None, default: tuple[str, ...]) -> tuple[str, ...] | None:
+    """
+    Resolves the ``fields`` query parameter; None means the full object.
+    """
+    if fields is None:
+        return default
+    if fields.strip() == ALL_FIELDS:
+        return None
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    invalid = [f for f in requested if not _FIELD.match(f)]
+    if invalid or not requested:
+        raise ValueError(f"Campos inválidos: {', '.join(invalid) or fields}")
+    return requested
+
+
+def parse_expand(expand: list[str] | None, allowed: tuple[str, ...]) -> tuple[str, ...]:
+    """
+    Validates the ``expand`` query parameter against the route's whitelist.
+
+    :return: Sorted, de-duplicated expansions (usable as part of a cache key).
+    """
+    requested = {e.strip() for value in expand or () for e in value.split(",") if e.strip()}
+    invalid = sorted(requested - set(allowed))
+    if invalid:
+        raise ValueError(
+            f"Expansiones no permitidas: {', '.join(invalid)}. Permitidas: {', '.join(allowed)}"
+        )
+    return tuple(sorted(requested))
+
+
+def project(obj: Any, fields: tuple[str, ...] | None) -> Any:
+    """
+    Copies only the requested fields of a Stripe object into a plain dict.
+
+    ``obj`` is never modified: it may be shared through the caches and single-flight. With
+    overlapping paths (``metadata,metadata.x``) the nested dict copied for the shorter path
+    is copied again before writing into it.
+    """
+    if fields is None or not isinstance(obj, dict) or "id" not in obj:
+        return obj
+    projected: dict[str, Any] = {}
+    # Dicts created by this projection; any other dict in ``projected`` belongs to ``obj``
+    owned = {id(projected)}
+    for path in fields:
+        *parents, leaf = path.split(".")
+        source, target = obj, projected
+        for key in parents:
+            source = source.get(key) if isinstance(source, dict) else None
+            child = target.get(key)
+            if id(child) not in owned:
+                child = dict(child) if isinstance(child, dict) else {}
+                target[key] = child
+                owned.add(id(child))
+            target = child
+        target[leaf] = source.get(leaf) if isinstance(source, dict) else None
+    return projected
+
+
+def projected_response(
+        obj: Any,
+        fields: str | None,
+        default: tuple[str, ...],
+        request: Request | None = None,
+        cache_control: str | None = None,
+        headers: dict[str, str] | None = None
+) -> Response:
+    """
+    Projects a Stripe object and serializes it straight to JSON bytes, skipping
+    ``jsonable_encoder``. With ``request`` and ``cache_control`` the response carries an
+    ETag and honours ``If-None-Match``; ``headers`` are added to the response.
+    """
+    projected = project(obj, parse_fields(fields, default))
+    if request is None or cache_control is None:
+        return FastJSONResponse(projected, headers=headers)
+    response = cached_json_response(request, projected, cache_control)
+    response.headers.update(headers or {})
+    return response
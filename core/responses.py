@@ -0,0 +1,68 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+
+from core import fast_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class of the app, encoded with ``core.fast_json`` (orjson).
+
+    Handlers that already hold plain dicts or Stripe objects can return
+    ``FastJSONResponse(result)`` directly to skip ``jsonable_encoder``.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return fast_json.dumps(content)
+
+
+def etag_for(body: bytes) -> str:
+    """
+    Strong ETag computed from the serialized body.
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison: a W/ prefix on the client's tag is ignored
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def conditional_response(
+        request: Request,
+        body: bytes,
+        cache_control: str,
+        etag: str | None = None,
+        gzip_body: bytes | None = None
+) -> Response:
+    """
+    Serves already-serialized JSON with ``ETag`` and ``Cache-Control``, answering 304 when
+    the client's ``If-None-Match`` matches. ``gzip_body`` is sent instead of ``body`` to
+    clients that accept gzip, under its own strong ETag (``-gzip`` suffix).
+    """
+    etag = etag or etag_for(body)
+    headers = {"Cache-Control": cache_control}
+    if gzip_body is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            body = gzip_body
+            etag = f'{etag[:-1]}-gzip"'
+    headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def cached_json_response(request: Request, content: Any, cache_control: str) -> Response:
+    """
+    Serializes ``content`` with ``core.fast_json`` and serves it as a conditional response.
+    """
+    return conditional_response(request, fast_json.dumps(content), cache_control)
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+_groups: dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into a single execution.
+
+    The result is shared with callers arriving up to ``window_seconds`` after it completes;
+    failures are never shared beyond the callers already waiting.
+    """
+
+    def __init__(self, name: str, window_seconds: float):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.calls = 0
+        self.shared = 0
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        _groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            # Runs as its own task so a cancelled caller does not cancel the others
+            flight = asyncio.ensure_future(fn())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(flight)
+
+    def _finish(self, key: Hashable, flight: asyncio.Future) -> None:
+        failed = flight.cancelled() or flight.exception() is not None
+        if failed or self.window_seconds <= 0:
+            self._forget(key, flight)
+        else:
+            asyncio.get_running_loop().call_later(self.window_seconds, self._forget, key, flight)
+
+    def _forget(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def forget(self, key: Hashable) -> None:
+        # After a write: the next read must not reuse the previous result
+        self._flights.pop(key, None)
+
+    def forget_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [k for k in self._flights if predicate(k)]:
+            del self._flights[key]
+
+    def stats(self) -> dict[str, Any]:
+        requests = self.calls + self.shared
+        return {
+            "in_flight": len(self._flights),
+            "window_seconds": self.window_seconds,
+            "calls": self.calls,
+            "shared": self.shared,
+            "shared_ratio": self.shared / requests if requests else 0.0,
+        }
+
+
+def single_flight_stats() -> dict[str, dict[str, Any]]:
+    return {name: group.stats() for name, group in _groups.items()}
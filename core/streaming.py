@@ -0,0 +1,49 @@
+import logging
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+from core import fast_json
+from core.event_log import log_event
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _error_line(error: Exception, count: int) -> bytes:
+    # The status line is already sent: a failure mid-export is reported as a last
+    # {"object": "error"} line so clients can tell a partial export from a complete one.
+    log_event(logging.ERROR, "ndjson.stream_failed", error=repr(error), count=count)
+    return fast_json.dumps({
+        "object": "error",
+        "error": {"type": type(error).__name__, "message": str(error)},
+        "count": count,
+    }) + b"\n"
+
+
+async def _encode_pages(pages: AsyncIterator[list[Any]]) -> AsyncIterator[bytes]:
+    # One chunk per page so each Stripe page is flushed as soon as it arrives.
+    count = 0
+    try:
+        async for page in pages:
+            yield b"".join(fast_json.dumps(item) + b"\n" for item in page)
+            count += len(page)
+    except Exception as e:
+        yield _error_line(e, count)
+
+
+async def _encode_items(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    async for item in items:
+        yield fast_json.dumps(item) + b"\n"
+
+
+def ndjson_response(pages: AsyncIterator[list[Any]]) -> StreamingResponse:
+    """
+    Streams every page as NDJSON, one object per line. If listing fails part way, the
+    body ends with a single ``{"object": "error", ...}`` line carrying the error and the
+    number of objects already sent; a body without it is a complete export.
+    """
+    return StreamingResponse(_encode_pages(pages), media_type=NDJSON_MEDIA_TYPE)
+
+
+def ndjson_items_response(items: AsyncIterator[Any]) -> StreamingResponse:
+    return StreamingResponse(_encode_items(items), media_type=NDJSON_MEDIA_TYPE)
@@ -1,20 +1,109 @@
+import asyncio
+
 from beanie import init_beanie
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from core.config import settings
+from models.customer_model import Customer
+from models.payment_model import PaymentIntent
+from models.price_model import Price
+from models.processed_event_model import ProcessedEvent
+from models.product_model import Product
+from models.rate_limit_model import RateLimitBucket
+from models.subscription_model import Subscription
+from models.webhook_event_model import WebhookEvent
+
+DOCUMENT_MODELS = [
+    Customer,
+    Product,
+    Price,
+    PaymentIntent,
+    Subscription,
+    WebhookEvent,
+    ProcessedEvent,
+    RateLimitBucket,
+]
+
+# Cliente de Motor compartido; lo crea y lo cierra el lifespan de la aplicación
+db_client: AsyncIOMotorClient | None = None
+
 
+def create_db_client() -> AsyncIOMotorClient:
+    """
+    Crea el cliente de Motor con la configuración del pool de conexiones de ``Settings``.
+
+    :return: Cliente de MongoDB.
+    """
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": settings.MONGO_READ_PREFERENCE,
+    }
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return AsyncIOMotorClient(settings.DATABASE_URL, **options)
 
 
-async def init_db():
+async def init_db(client: AsyncIOMotorClient):
     """
     Inicializa la conexión a la base de datos y configura los modelos de documentos.
 
+    :param client: Cliente de Motor creado en el lifespan.
     :return: None
     """
-    client = AsyncIOMotorClient(settings.DATABASE_URL)
+    global db_client
+    db_client = client
 
     await init_beanie(
         database=client[settings.DATABASE_NAME],
-        document_models=[
-
-        ],
+        document_models=DOCUMENT_MODELS,
     )
+
+
+async def warm_up_db(client: AsyncIOMotorClient):
+    """
+    Abre conexiones del pool y carga las colecciones antes de la primera petición.
+
+    :param client: Cliente de Motor creado en el lifespan.
+    :return: None
+    """
+    await client.admin.command("ping")
+    # Consultas concurrentes: cada una ocupa una conexión distinta del pool
+    await asyncio.gather(*(
+        model.get_motor_collection().find_one({}, projection={"_id": True})
+        for model in DOCUMENT_MODELS
+    ))
+
+
+def close_db(client: AsyncIOMotorClient):
+    """
+    Cierra el pool de conexiones del cliente.
+
+    :param client: Cliente de Motor creado en el lifespan.
+    :return: None
+    """
+    global db_client
+    client.close()
+    if db_client is client:
+        db_client = None
+
+
+def get_db_client() -> AsyncIOMotorClient:
+    """
+    Dependencia de FastAPI que devuelve el cliente de Motor compartido.
+
+    :return: Cliente de MongoDB.
+    """
+    if db_client is None:
+        raise RuntimeError("La base de datos no está inicializada")
+    return db_client
+
+
+def get_database() -> AsyncIOMotorDatabase:
+    """
+    Dependencia de FastAPI que devuelve la base de datos de la aplicación.
+
+    :return: Base de datos de MongoDB.
+    """
+    return get_db_client()[settings.DATABASE_NAME]
@@ -4,7 +4,10 @@ tags_metadata = [
     {"name": "Payment-Method", "description": "Payment-Method routes"},
     {"name": "Price", "description": "Price routes"},
     {"name": "Product", "description": "Product routes"},
+    {"name": "Catalog", "description": "Pre-computed product and price catalog"},
     {"name": "Subscription", "description": "Subscription routes"},
     {"name": "Webhook", "description": "Webhook routes"},
-    {"name": "Health-Check", "description": "Health-Check routes"}
+    {"name": "Health-Check", "description": "Health-Check routes"},
+    {"name": "Metrics", "description": "Prometheus metrics"},
+    {"name": "Admin", "description": "Request profiling captures"}
 ]
@@ -1,18 +1,41 @@
-from fastapi import FastAPI
+import stripe
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
 from api.v1.router import router
 from core.config import settings
+from core.event_log import start_event_logging, stop_event_logging
+from core.metrics import LoopLagMonitor, MetricsMiddleware
+from core.profiling import ProfilingMiddleware
+from core.responses import FastJSONResponse
 from contextlib import asynccontextmanager
-from dependencies.database import init_db
+from dependencies.database import close_db, create_db_client, init_db, warm_up_db
 from docs import tags_metadata
+from services.stripe_gateway import StripeGateway, retry_after
+from services.webhook_queue import WebhookQueue
+from services.webhook_services import WebhookServices
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize DB.
-    await init_db()
+    start_event_logging()
+    # Initialize DB (shared Motor client with its connection pool).
+    db_client = create_db_client()
+    await init_db(db_client)
+    await warm_up_db(db_client)
     print("Init db ...")
+    # Initialize the shared Stripe client (pooled, keep-alive connections).
+    StripeGateway.start()
+    # Start the webhook queue workers.
+    WebhookQueue.start(WebhookServices.process_event)
+    # Sample event loop lag for /metrics.
+    LoopLagMonitor.start()
     yield
+    await LoopLagMonitor.stop()
+    await WebhookQueue.stop()
+    await StripeGateway.close()
+    close_db(db_client)
+    stop_event_logging()
 
 
 app = FastAPI(
@@ -23,7 +46,25 @@ app = FastAPI(
     openapi_tags=tags_metadata,
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+
+# Request latency per route template, served at /metrics.
+app.add_middleware(MetricsMiddleware)
+# Opt-in span timelines for slow requests (PROFILING_* settings).
+app.add_middleware(ProfilingMiddleware)
+
+
+@app.exception_handler(stripe.error.RateLimitError)
+async def stripe_rate_limit_handler(request: Request, exc: stripe.error.RateLimitError):
+    # Stripe keeps rejecting after the gateway retries: surface it as 429, not 400
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(retry_after(exc))))},
+    )
+
+
 app.include_router(router, prefix=settings.API_V1_STR)
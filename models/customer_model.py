@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from beanie import Document
 from pydantic import EmailStr, Field
+from pymongo import ASCENDING, IndexModel
 from uuid import UUID, uuid4
 from enum import Enum
 
@@ -21,6 +22,9 @@ class Customer(Document):
     status: CustomerStatus = CustomerStatus.ACTIVE
     metadata: Dict[str, Any] = Field(default_factory=dict)
     default_payment_method: Optional[str] = None
+    data: Dict[str, Any] = Field(default_factory=dict)  # Objeto completo de Stripe (mirror)
+    version: int = 0  # Timestamp del último evento aplicado
+    deleted: bool = False  # Tombstone: el objeto se eliminó en Stripe
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
@@ -28,5 +32,9 @@ class Customer(Document):
         name = "customers"
         indexes = [
             "email",
-            "stripe_customer_id"
+            IndexModel(
+                [("stripe_customer_id", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"stripe_customer_id": {"$type": "string"}},
+            ),
         ]
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional, Dict, Any
+from beanie import Document
+from pydantic import Field
+
+
+class Price(Document):
+    id: str  # ID del precio en Stripe
+    product: str
+    active: bool = True
+    currency: str
+    unit_amount: Optional[int] = None
+    type: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    data: Dict[str, Any] = Field(default_factory=dict)  # Objeto completo de Stripe
+    version: int = 0  # Timestamp del último evento aplicado
+    deleted: bool = False  # Tombstone: el objeto se eliminó en Stripe
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "prices"
+        indexes = [
+            "product",
+            "active"
+        ]
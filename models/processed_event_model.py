@@ -0,0 +1,30 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+from core.config import settings
+
+
+class ProcessedEventStatus(str, Enum):
+    PROCESSING = "processing"  # Reclamado por un worker; caduca en locked_until
+    PROCESSED = "processed"
+
+
+class ProcessedEvent(Document):
+    id: str  # ID del evento de Stripe
+    event_type: str
+    status: ProcessedEventStatus = ProcessedEventStatus.PROCESSED
+    locked_until: Optional[datetime] = None
+    processed_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "processed_events"
+        indexes = [
+            IndexModel(
+                [("processed_at", ASCENDING)],
+                expireAfterSeconds=settings.WEBHOOK_DEDUP_TTL_SECONDS,
+            ),
+        ]
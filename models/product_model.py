@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional, Dict, Any
+from beanie import Document
+from pydantic import Field
+
+
+class Product(Document):
+    id: str  # ID del producto en Stripe
+    name: str
+    active: bool = True
+    description: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    data: Dict[str, Any] = Field(default_factory=dict)  # Objeto completo de Stripe
+    version: int = 0  # Timestamp del último evento aplicado
+    deleted: bool = False  # Tombstone: el objeto se eliminó en Stripe
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "products"
+        indexes = [
+            "active"
+        ]
@@ -0,0 +1,11 @@
+from beanie import Document
+
+
+class RateLimitBucket(Document):
+    id: str  # Nombre del bucket (ej. 'stripe:read')
+    tokens: float
+    updated_at: float  # Epoch en segundos de la última recarga
+    paused_until: float = 0.0  # Epoch hasta el que Stripe pidió no enviar peticiones
+
+    class Settings:
+        name = "rate_limit_buckets"
@@ -1,6 +1,7 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Optional, Dict, Any
+from beanie import Document
 from pydantic import BaseModel, EmailStr, Field
 from uuid import UUID, uuid4
 
@@ -76,3 +77,21 @@ class CreateSubscriptionRequest(BaseModel):
     price_id: str
     trial_period_days: Optional[int] = Field(None, ge=0)
     metadata: dict = Field(default_factory=dict)
+
+
+# Mirror of Stripe Subscriptions synced from webhooks
+class Subscription(Document):
+    id: str  # ID de la suscripción en Stripe
+    customer: str
+    status: str
+    data: Dict[str, Any] = Field(default_factory=dict)  # Objeto completo de Stripe
+    version: int = 0  # Timestamp del último evento aplicado
+    deleted: bool = False  # Tombstone: el objeto se eliminó en Stripe
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "subscriptions"
+        indexes = [
+            "customer",
+            "status"
+        ]
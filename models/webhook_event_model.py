@@ -0,0 +1,31 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+
+class WebhookEventStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DEAD = "dead"
+
+
+class WebhookEvent(Document):
+    event_id: str
+    event_type: str
+    payload: str  # Cuerpo crudo del webhook, ya verificado
+    status: WebhookEventStatus = WebhookEventStatus.PENDING
+    attempts: int = 0
+    last_error: Optional[str] = None
+    available_at: datetime = Field(default_factory=datetime.now)
+    locked_until: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "webhook_events"
+        indexes = [
+            IndexModel([("status", ASCENDING), ("available_at", ASCENDING)]),
+            IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)]),
+        ]
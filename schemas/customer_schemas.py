@@ -60,6 +60,27 @@ class PaymentMethodResponse(BaseModel):
     is_default: bool
 
 
+# Schema for bulk customer lookup by email
+class CustomerEmailLookup(BaseModel):
+    emails: list[EmailStr] = Field(..., min_length=1, max_length=100)
+
+
+# Schema for batch customer creation
+class CustomerBatchCreate(BaseModel):
+    items: list[CustomerCreate] = Field(..., min_length=1, max_length=1000)
+
+
+# Schema for one item of a batch customer update
+class CustomerBatchUpdateItem(BaseModel):
+    id: str
+    data: CustomerUpdate
+
+
+# Schema for batch customer update
+class CustomerBatchUpdate(BaseModel):
+    items: list[CustomerBatchUpdateItem] = Field(..., min_length=1, max_length=1000)
+
+
 # Schema for customer search/filter
 class CustomerFilter(BaseModel):
     email: Optional[str] = None
@@ -117,3 +138,23 @@ class CustomerStatusUpdate(BaseModel):
 class CustomerDelete(BaseModel):
     permanent: bool = False
     reason: Optional[str] = None
+
+
+# Campos del cliente de Stripe devueltos por defecto (parámetro ``fields``), equivalentes a
+# CustomerResponse: el ID de Stripe en lugar del UUID local, 'delinquent' en lugar de
+# 'status' y 'created' en lugar de created_at/updated_at.
+STRIPE_CUSTOMER_FIELDS = (
+    *CustomerBase.model_fields,
+    "id",
+    "delinquent",
+    "invoice_settings.default_payment_method",
+    "created",
+)
+
+# Expansiones de Stripe permitidas (parámetro ``expand``)
+CUSTOMER_EXPANSIONS = (
+    "default_source",
+    "invoice_settings.default_payment_method",
+    "subscriptions",
+    "tax",
+)
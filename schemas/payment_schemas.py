@@ -97,3 +97,13 @@ class RefundResponse(BaseModel):
     created: int = Field(..., description="Timestamp de creación.")
     charge: str = Field(..., description="ID del Charge asociado.")
     reason: str | None = Field(None, description="Razón del reembolso.")
+
+
+# Campos devueltos por defecto en las respuestas (parámetro ``fields``)
+PAYMENT_INTENT_FIELDS = tuple(PaymentIntentResponse.model_fields)
+SETUP_INTENT_FIELDS = tuple(SetupIntentResponse.model_fields)
+CHARGE_FIELDS = tuple(ChargeResponse.model_fields)
+REFUND_FIELDS = tuple(RefundResponse.model_fields)
+
+# Expansiones de Stripe permitidas (parámetro ``expand``)
+PAYMENT_INTENT_EXPANSIONS = ("customer", "latest_charge", "payment_method")
@@ -52,4 +52,12 @@ class PriceListResponse(BaseModel):
     items: list[PriceResponse]
     total: int
     has_more: bool
+    next_starting_after: str = None
     object: str = "list"
+
+
+# Campos devueltos por defecto en las respuestas (parámetro ``fields``)
+PRICE_FIELDS = tuple(PriceResponse.model_fields)
+
+# Expansiones de Stripe permitidas (parámetro ``expand``)
+PRICE_EXPANSIONS = ("currency_options", "product", "tiers")
@@ -48,4 +48,9 @@ class ProductListResponse(BaseModel):
     items: list[ProductResponse]
     total: int
     has_more: bool
+    next_starting_after: str = None
     object: str = "list"
+
+
+# Campos devueltos por defecto en las respuestas (parámetro ``fields``)
+PRODUCT_FIELDS = tuple(ProductResponse.model_fields)
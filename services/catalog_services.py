@@ -0,0 +1,235 @@
+import asyncio
+import gzip
+import logging
+import time
+from typing import Any
+
+from core import fast_json
+from core.config import settings
+from core.event_log import log_event
+from core.profiling import profiled
+from core.projection import project
+from core.responses import etag_for
+from core.single_flight import SingleFlight
+from schemas.price_schemas import PRICE_FIELDS
+from schemas.product_schemas import PRODUCT_FIELDS
+from services.price_services import PriceServices
+from services.product_services import ProductServices
+
+# Las peticiones concurrentes mientras se construye el catálogo comparten la construcción
+catalog_flight = SingleFlight("catalog", 0)
+
+
+class CatalogSnapshot:
+    """
+    Catálogo producto -> precios ya serializado y comprimido, listo para servirse tal cual.
+    """
+
+    def __init__(self, products: dict[str, dict], prices: dict[str, dict], built_at: float):
+        self.products = products
+        self.prices = prices
+        self.built_at = built_at
+        self.updated_at = time.time()
+
+        by_product: dict[str, list[dict]] = {}
+        for price in prices.values():
+            by_product.setdefault(price.get("product"), []).append(price)
+        catalog = [
+            {**product, "prices": by_product.get(product_id, [])}
+            for product_id, product in products.items()
+        ]
+        # Sin marcas de tiempo en el cuerpo: el ETag solo cambia si cambia el contenido
+        self.body = fast_json.dumps({"object": "catalog", "products": catalog})
+        self.gzip_body = gzip.compress(self.body, compresslevel=6, mtime=0)
+        self.etag = etag_for(self.body)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "products": len(self.products),
+            "prices": len(self.prices),
+            "bytes": len(self.body),
+            "gzip_bytes": len(self.gzip_body),
+            "etag": self.etag,
+            "built_at": self.built_at,
+            "updated_at": self.updated_at,
+        }
+
+
+@profiled
+class CatalogServices:
+    """
+    Mantiene en memoria el catálogo de productos activos con sus precios activos.
+
+    Se construye recorriendo todas las páginas de productos y precios, se actualiza de forma
+    incremental con los webhooks 'product.updated' y 'price.updated' y se reconstruye por
+    completo cada CATALOG_SNAPSHOT_TTL_SECONDS, en segundo plano mientras se sigue sirviendo
+    el catálogo anterior. Los webhooks recibidos durante una reconstrucción se vuelven a
+    aplicar sobre el resultado.
+
+    Los webhooks solo modifican los mapas en memoria; el cuerpo se vuelve a serializar una vez
+    por ráfaga, CATALOG_PATCH_DEBOUNCE_SECONDS después del primer cambio y fuera del event loop.
+    """
+
+    snapshot: CatalogSnapshot | None = None
+    # Mapas vigentes, con los webhooks ya aplicados aunque aún no se hayan publicado
+    _products: dict[str, dict] | None = None
+    _prices: dict[str, dict] | None = None
+    _built_at: float = 0.0
+    # Versión de los mapas y versión del snapshot publicado
+    _version: int = 0
+    _published: int = 0
+    # Webhooks aplicados desde que empezó la reconstrucción en curso (None si no hay ninguna)
+    _patches: list[tuple[str, dict[str, Any]]] | None = None
+    _refresh: asyncio.Task | None = None
+    _publish_task: asyncio.Task | None = None
+
+    @staticmethod
+    async def get_snapshot() -> CatalogSnapshot:
+        """
+        Devuelve el catálogo en memoria. Solo la primera petición espera a construirlo; si ha
+        expirado se sirve el anterior y se reconstruye en segundo plano.
+
+        :return: Catálogo serializado.
+        """
+        snapshot = CatalogServices.snapshot
+        if snapshot is None:
+            return await catalog_flight.do("snapshot", CatalogServices.rebuild)
+        expired = time.time() - snapshot.built_at > settings.CATALOG_SNAPSHOT_TTL_SECONDS
+        if expired and CatalogServices._refresh is None:
+            CatalogServices._refresh = asyncio.ensure_future(
+                catalog_flight.do("snapshot", CatalogServices.rebuild)
+            )
+            CatalogServices._refresh.add_done_callback(CatalogServices._refreshed)
+        return snapshot
+
+    @staticmethod
+    def _refreshed(task: asyncio.Task) -> None:
+        CatalogServices._refresh = None
+        if not task.cancelled() and task.exception() is not None:
+            # Se sigue sirviendo el catálogo anterior; la siguiente petición lo reintenta
+            log_event(logging.ERROR, "catalog.rebuild_failed", error=repr(task.exception()))
+
+    @staticmethod
+    def _published_patches(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            # Los cambios siguen en los mapas; se publican con el siguiente webhook o rebuild
+            log_event(logging.ERROR, "catalog.publish_failed", error=repr(task.exception()))
+
+    @staticmethod
+    async def rebuild() -> CatalogSnapshot:
+        """
+        Construye el catálogo completo recorriendo todas las páginas de productos y precios.
+
+        :return: Catálogo serializado.
+        """
+        built_at = time.time()
+        CatalogServices._patches = patches = []
+        try:
+            products = {
+                product["id"]: project(product, PRODUCT_FIELDS)
+                for product in await CatalogServices._walk(ProductServices.list_products)
+            }
+            prices = {
+                price["id"]: project(price, PRICE_FIELDS)
+                for price in await CatalogServices._walk(PriceServices.list_prices)
+            }
+        finally:
+            CatalogServices._patches = None
+        # Las páginas pueden ser anteriores a los webhooks recibidos mientras se recorrían
+        for kind, obj in patches:
+            _patch(products if kind == "product" else prices, obj, kind)
+        CatalogServices._products, CatalogServices._prices = products, prices
+        CatalogServices._built_at = built_at
+        CatalogServices._version += 1
+        return await CatalogServices._publish()
+
+    @staticmethod
+    async def _publish() -> CatalogSnapshot:
+        """
+        Serializa y comprime los mapas vigentes en un hilo y publica el resultado, salvo que
+        mientras tanto se haya publicado uno más reciente.
+
+        :return: Catálogo publicado.
+        """
+        version = CatalogServices._version
+        # Copias: los webhooks siguen modificando los mapas mientras el hilo serializa
+        snapshot = await asyncio.to_thread(
+            CatalogSnapshot,
+            dict(CatalogServices._products),
+            dict(CatalogServices._prices),
+            CatalogServices._built_at,
+        )
+        if version > CatalogServices._published:
+            CatalogServices._published = version
+            CatalogServices.snapshot = snapshot
+        return CatalogServices.snapshot
+
+    @staticmethod
+    async def _publish_later() -> None:
+        await asyncio.sleep(settings.CATALOG_PATCH_DEBOUNCE_SECONDS)
+        # Los cambios que lleguen durante la serialización programan otra publicación
+        CatalogServices._publish_task = None
+        await CatalogServices._publish()
+
+    @staticmethod
+    def _changed() -> None:
+        CatalogServices._version += 1
+        if CatalogServices._publish_task is None:
+            CatalogServices._publish_task = asyncio.ensure_future(
+                CatalogServices._publish_later()
+            )
+            CatalogServices._publish_task.add_done_callback(CatalogServices._published_patches)
+
+    @staticmethod
+    async def _walk(list_page) -> list[Any]:
+        items, starting_after = [], None
+        while True:
+            page = await list_page(active_only=True, limit=100, starting_after=starting_after)
+            items.extend(page["items"])
+            if not page["has_more"]:
+                return items
+            starting_after = page["next_starting_after"]
+
+    @staticmethod
+    def apply_product(product: dict[str, Any]) -> None:
+        """
+        Actualiza un producto del catálogo a partir de un webhook 'product.updated'.
+
+        :param product: Producto recibido en el evento.
+        """
+        if CatalogServices._patches is not None:
+            CatalogServices._patches.append(("product", product))
+        if CatalogServices._products is None:
+            return
+        _patch(CatalogServices._products, product, "product")
+        CatalogServices._changed()
+
+    @staticmethod
+    def apply_price(price: dict[str, Any]) -> None:
+        """
+        Actualiza un precio del catálogo a partir de un webhook 'price.updated'.
+
+        :param price: Precio recibido en el evento.
+        """
+        if CatalogServices._patches is not None:
+            CatalogServices._patches.append(("price", price))
+        if CatalogServices._prices is None:
+            return
+        _patch(CatalogServices._prices, price, "price")
+        CatalogServices._changed()
+
+    @staticmethod
+    def stats() -> dict[str, Any] | None:
+        """
+        :return: Tamaño y antigüedad del catálogo en memoria (None si aún no se ha construido).
+        """
+        snapshot = CatalogServices.snapshot
+        return snapshot.stats() if snapshot else None
+
+
+def _patch(objects: dict[str, dict], obj: dict[str, Any], kind: str) -> None:
+    # Solo los objetos activos forman parte del catálogo
+    if obj.get("active"):
+        objects[obj["id"]] = project(obj, PRODUCT_FIELDS if kind == "product" else PRICE_FIELDS)
+    else:
+        objects.pop(obj["id"], None)
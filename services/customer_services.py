@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-import stripe
-from typing import Any
-from core.config import settings
-from schemas.customer_schemas import CustomerCreate, CustomerUpdate
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from beanie.odm.operators.update.general import Set
+from beanie.operators import In
 
-# Configura tu clave secreta de Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from core.config import settings
+from core.event_log import log_event
+from core.profiling import profiled
+from models.customer_model import Customer
+from schemas.customer_schemas import CustomerCreate, CustomerUpdate, CustomerBatchUpdateItem
+from services.stripe_gateway import StripeGateway, expand_params
 
 
+@profiled
 class CustomerServices:
 
     @staticmethod
@@ -19,12 +26,14 @@ class CustomerServices:
         :return: Datos del cliente creado en Stripe.
         """
         # Crea un cliente en Stripe
-        stripe_customer = stripe.Customer.create(
+        stripe_customer = await StripeGateway.call(
+            "Customer", "create",
             email=customer_data.email,
             name=customer_data.name,
             phone=customer_data.phone,
             metadata=customer_data.metadata or {}
         )
+        await CustomerServices.index_customer(stripe_customer)
 
         return {
             "short_response": {
@@ -39,50 +48,215 @@ class CustomerServices:
         }
 
     @staticmethod
-    async def get_stripe_all_customers() -> list[dict[str, Any]]:
+    def create_stripe_customers_batch(items: list[CustomerCreate]) -> AsyncIterator[dict]:
         """
-        Obtiene todos los clientes de Stripe.
+        Crea varios clientes en Stripe de forma concurrente.
 
-        :return: Lista de clientes de Stripe.
+        :param items: Clientes a crear.
+        :return: Generador asíncrono con el resultado de cada elemento según va terminando.
         """
-        # Obtiene la lista de clientes desde Stripe
-        customers_response = stripe.Customer.list(limit=100)
+        async def create(item: CustomerCreate) -> dict[str, Any]:
+            result = await CustomerServices.create_stripe_customer(item)
+            return result["short_response"]
 
-        # Asegúrate de que 'data' esté presente y sea una lista
-        customers = customers_response.get("data", [])
-        if not isinstance(customers, list):
-            raise ValueError("El campo 'data' no contiene una lista válida de clientes")
+        return CustomerServices._run_batch([
+            lambda item=item: create(item) for item in items
+        ])
+
+    @staticmethod
+    def update_stripe_customers_batch(items: list[CustomerBatchUpdateItem]) -> AsyncIterator[dict]:
+        """
+        Actualiza varios clientes en Stripe de forma concurrente.
+
+        :param items: Clientes a actualizar (ID y datos).
+        :return: Generador asíncrono con el resultado de cada elemento según va terminando.
+        """
+        return CustomerServices._run_batch([
+            lambda item=item: CustomerServices.update_stripe_customer(item.id, item.data)
+            for item in items
+        ])
+
+    @staticmethod
+    async def _run_batch(
+            operations: list[Callable[[], Awaitable[Any]]]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Ejecuta operaciones con un semáforo acotado; el limitador de ``StripeGateway`` regula
+        la tasa y reintenta los 429 de Stripe.
+
+        :param operations: Operaciones a ejecutar, en el orden de la petición.
+        :return: Generador asíncrono de resultados por elemento (índice, estado y datos o error).
+        """
+        semaphore = asyncio.Semaphore(settings.CUSTOMER_BATCH_CONCURRENCY)
+
+        async def run(index: int, operation: Callable[[], Awaitable[Any]]) -> dict[str, Any]:
+            async with semaphore:
+                try:
+                    return {"index": index, "status": "ok", "data": await operation()}
+                except Exception as e:
+                    return {"index": index, "status": "error", "error": str(e)}
+
+        tasks = [asyncio.create_task(run(index, op)) for index, op in enumerate(operations)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # El cliente cerró la conexión: cancela los elementos pendientes
+            for task in tasks:
+                task.cancel()
 
-        # Procesa los clientes para obtener los datos necesarios
-        processed_customers = []
-        for customer in customers:
-            processed_customers.append(customer)
+    @staticmethod
+    async def get_stripe_all_customers(
+            limit: int = 100,
+            starting_after: str | None = None,
+            expand: tuple[str, ...] = ()
+    ) -> dict[str, Any]:
+        """
+        Obtiene una página de clientes de Stripe.
 
-        return processed_customers if len(processed_customers) > 0 else {
-            "message": "No customers found"}
+        :param limit: Número máximo de clientes de la página (1-100).
+        :param starting_after: ID del último cliente de la página anterior (opcional).
+        :param expand: Objetos relacionados a expandir en cada cliente (opcional).
+        :return: Página de clientes y cursor de la siguiente página.
+        """
+        return await StripeGateway.list_page(
+            "Customer", limit=limit, starting_after=starting_after,
+            **expand_params(expand, in_list=True)
+        )
 
     @staticmethod
-    async def get_stripe_customer_by_email(email: str) -> dict | None:
+    def iter_stripe_customers(expand: tuple[str, ...] = ()) -> AsyncIterator[list[Any]]:
+        """
+        Recorre todos los clientes de Stripe página a página.
+
+        :param expand: Objetos relacionados a expandir en cada cliente (opcional).
+        :return: Generador asíncrono de páginas de clientes.
+        """
+        return StripeGateway.paginate("Customer", **expand_params(expand, in_list=True))
+
+    @staticmethod
+    async def get_stripe_customer_by_email(
+            email: str,
+            expand: tuple[str, ...] = ()
+    ) -> dict | None:
         """
         Obtiene un cliente en Stripe basado en su email.
 
+        Primero resuelve el ID de Stripe desde el índice local (colección ``customers``) y,
+        si no está indexado, usa el filtro por email del lado de Stripe.
+
         :param email: Email del cliente.
+        :param expand: Objetos relacionados a expandir (opcional).
         :return: Datos del cliente si existe, None si no se encuentra.
         """
-        # Obtiene la lista de clientes desde Stripe
-        customers_response = stripe.Customer.list(limit=100)
+        customer = await CustomerServices._resolve_email(email, expand=expand)
+        return customer if customer is not None else {"message": "Customer not found"}
 
-        # Asegúrate de que 'data' esté presente y sea una lista
+    @staticmethod
+    async def get_stripe_customers_by_emails(
+            emails: list[str],
+            expand: tuple[str, ...] = ()
+    ) -> dict[str, Any]:
+        """
+        Resuelve varios emails en una sola llamada.
+
+        Los emails indexados localmente se buscan con una única consulta a la base de datos;
+        el resto se resuelve concurrentemente con el filtro por email de Stripe.
+
+        :param emails: Lista de emails a resolver.
+        :param expand: Objetos relacionados a expandir en cada cliente (opcional).
+        :return: Diccionario email -> datos del cliente (None si no se encuentra).
+        """
+        emails = list(dict.fromkeys(emails))
+        indexed = {
+            customer.email: customer
+            for customer in await Customer.find(In(Customer.email, emails)).to_list()
+            if customer.stripe_customer_id
+        }
+
+        customers = await asyncio.gather(*(
+            CustomerServices._resolve_email(email, indexed.get(email), expand)
+            for email in emails
+        ))
+        return dict(zip(emails, customers))
+
+    @staticmethod
+    async def _resolve_email(
+            email: str,
+            indexed: Customer | None = None,
+            expand: tuple[str, ...] = ()
+    ) -> Any | None:
+        """
+        Obtiene un cliente de Stripe por email usando el índice local como atajo.
+
+        :param email: Email del cliente.
+        :param indexed: Entrada del índice ya consultada (opcional).
+        :param expand: Objetos relacionados a expandir (opcional).
+        :return: Cliente de Stripe o None si no existe.
+        """
+        if indexed is None:
+            indexed = await Customer.find_one(Customer.email == email)
+        stripe_customer_id = indexed.stripe_customer_id if indexed else None
+
+        if settings.MIRROR_READS_ENABLED and indexed and indexed.data and not expand:
+            # Copia replicada desde los webhooks (sin expandir)
+            return indexed.data
+
+        if stripe_customer_id:
+            customer = await StripeGateway.call(
+                "Customer", "retrieve", stripe_customer_id, **expand_params(expand)
+            )
+            if not customer.get("deleted") and customer.get("email") == email:
+                return customer
+            # La entrada del índice está obsoleta
+            try:
+                await Customer.find(Customer.stripe_customer_id == stripe_customer_id).delete()
+            except Exception as e:
+                # Se vuelve a descartar en la siguiente búsqueda por email
+                log_event(logging.WARNING, "customer.index_failed",
+                          id=stripe_customer_id, error=repr(e))
+
+        # Filtro por email del lado de Stripe
+        customers_response = await StripeGateway.call(
+            "Customer", "list", email=email, limit=1, **expand_params(expand, in_list=True)
+        )
         customers = customers_response.get("data", [])
-        if not isinstance(customers, list):
-            raise ValueError("El campo 'data' no contiene una lista válida de clientes")
+        if not customers:
+            return None
+
+        await CustomerServices.index_customer(customers[0])
+        return customers[0]
+
+    @staticmethod
+    async def index_customer(stripe_customer: Any) -> None:
+        """
+        Inserta o actualiza la entrada del índice local email -> ID de Stripe.
+
+        El índice es un atajo: si falla, la escritura en Stripe ya se hizo y no debe
+        reportarse como error (el cliente la reintentaría y duplicaría el cliente), así que
+        el fallo solo se registra; la siguiente búsqueda por email lo recupera desde Stripe.
 
-        # Busca el cliente por email
-        for customer in customers:
-            if customer.get("email") == email:  # Usa .get() para evitar KeyError
-                return customer  # Retorna toda la data del cliente
-        # Si no se encuentra el cliente, devuelve None
-        return {"message": "Customer not found"}
+        :param stripe_customer: Cliente devuelto por Stripe.
+        """
+        if not stripe_customer.get("email"):
+            return
+
+        fields = {
+            "email": stripe_customer["email"],
+            "name": stripe_customer.get("name") or "",
+            "phone": stripe_customer.get("phone"),
+            "metadata": dict(stripe_customer.get("metadata") or {}),
+        }
+        try:
+            await Customer.find_one(
+                Customer.stripe_customer_id == stripe_customer["id"]
+            ).upsert(
+                Set(fields),
+                on_insert=Customer(stripe_customer_id=stripe_customer["id"], **fields),
+            )
+        except Exception as e:
+            log_event(logging.WARNING, "customer.index_failed",
+                      id=stripe_customer["id"], error=repr(e))
 
     @staticmethod
     async def add_payment_method(
@@ -98,13 +272,15 @@ class CustomerServices:
         :param set_as_default: Si el método debe establecerse como predeterminado.
         :return: Datos del método de pago agregado.
         """
-        payment_method = stripe.PaymentMethod.attach(
+        payment_method = await StripeGateway.call(
+            "PaymentMethod", "attach",
             payment_method_id,
             customer=stripe_customer_id
         )
 
         if set_as_default:
-            stripe.Customer.modify(
+            await StripeGateway.call(
+                "Customer", "modify",
                 stripe_customer_id,
                 invoice_settings={
                     "default_payment_method": payment_method_id
@@ -138,10 +314,12 @@ class CustomerServices:
             raise ValueError("No hay datos válidos para actualizar al cliente")
 
         # Actualiza el cliente en Stripe
-        updated_customer = stripe.Customer.modify(
+        updated_customer = await StripeGateway.call(
+            "Customer", "modify",
             stripe_customer_id,
             **update_data
         )
+        await CustomerServices.index_customer(updated_customer)
         return updated_customer
 
     @staticmethod
@@ -151,7 +329,13 @@ class CustomerServices:
 
         :param stripe_customer_id: ID del cliente en Stripe.
         """
-        stripe.Customer.delete(stripe_customer_id)
+        await StripeGateway.call("Customer", "delete", stripe_customer_id)
+        try:
+            await Customer.find(Customer.stripe_customer_id == stripe_customer_id).delete()
+        except Exception as e:
+            # Una entrada obsoleta se descarta en la siguiente búsqueda por email
+            log_event(logging.WARNING, "customer.index_failed",
+                      id=stripe_customer_id, error=repr(e))
 
     @staticmethod
     async def get_payment_methods(
@@ -163,7 +347,8 @@ class CustomerServices:
         :param stripe_customer_id: ID del cliente en Stripe.
         :return: Lista de métodos de pago.
         """
-        payment_methods_response = stripe.PaymentMethod.list(
+        payment_methods_response = await StripeGateway.call(
+            "PaymentMethod", "list",
             customer=stripe_customer_id,
             type="card"
         )
@@ -199,7 +384,8 @@ class CustomerServices:
         :param trial_period_days: Número de días de prueba gratuitos (opcional).
         :return: Datos de la suscripción creada.
         """
-        subscription = stripe.Subscription.create(
+        subscription = await StripeGateway.call(
+            "Subscription", "create",
             customer=stripe_customer_id,
             items=[{"price": price_id}],
             trial_period_days=trial_period_days
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from core.cache import MISSING, TTLCache
+from core.config import settings
+from core.metrics import LoopLagMonitor
+from core.single_flight import SingleFlight
+from dependencies.database import get_db_client
+from services.rate_limiter import StripeRateLimiter
+from services.stripe_gateway import StripeGateway
+from services.webhook_queue import WebhookQueue
+
+# Resultados de las sondas, para que los balanceadores no generen carga en Mongo ni Stripe
+probe_cache = TTLCache("health_probes", 8, settings.HEALTH_PROBE_CACHE_SECONDS)
+probe_flight = SingleFlight("health_probes", 0)
+
+
+class HealthServices:
+    """
+    Comprobaciones de liveness y readiness de la API.
+    """
+
+    @staticmethod
+    def liveness() -> dict[str, Any]:
+        """
+        El proceso responde; no consulta dependencias externas.
+
+        :return: Estado y retraso actual del event loop.
+        """
+        return {"status": "alive", "event_loop_lag_seconds": LoopLagMonitor.last_lag}
+
+    @staticmethod
+    async def readiness() -> dict[str, Any]:
+        """
+        Comprueba MongoDB y la conectividad con Stripe (resultados en caché durante
+        HEALTH_PROBE_CACHE_SECONDS), el retraso del event loop y las colas.
+
+        :return: Estado 'ready' o 'not_ready' con el detalle de cada comprobación.
+        """
+        mongo, stripe_probe, webhook_queue = await asyncio.gather(
+            HealthServices._cached_probe("mongo", HealthServices._ping_mongo),
+            HealthServices._cached_probe("stripe", HealthServices._ping_stripe),
+            HealthServices._cached_probe("webhook_queue", WebhookQueue.backlog),
+        )
+        loop_lag = LoopLagMonitor.last_lag
+        ready = (
+            mongo["ok"]
+            and stripe_probe["ok"]
+            and loop_lag <= settings.HEALTH_MAX_LOOP_LAG_SECONDS
+        )
+        return {
+            "status": "ready" if ready else "not_ready",
+            "checks": {
+                "mongo": mongo,
+                "stripe": stripe_probe,
+                "event_loop": {
+                    "ok": loop_lag <= settings.HEALTH_MAX_LOOP_LAG_SECONDS,
+                    "lag_seconds": loop_lag,
+                },
+            },
+            "queues": {
+                "webhooks": webhook_queue.get("result"),
+                "stripe_rate_limit": StripeRateLimiter.stats()["queue_depth"],
+            },
+        }
+
+    @staticmethod
+    async def _cached_probe(name: str, probe: Callable[[], Awaitable[Any]]) -> dict[str, Any]:
+        result = probe_cache.get(name)
+        if result is MISSING:
+            result = await probe_flight.do(name, lambda: HealthServices._run_probe(probe))
+            probe_cache.set(name, result)
+        return result
+
+    @staticmethod
+    async def _run_probe(probe: Callable[[], Awaitable[Any]]) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(probe(), settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        checked = {
+            "ok": True,
+            "latency_seconds": time.perf_counter() - start,
+            "checked_at": time.time(),
+        }
+        if result is not None:
+            checked["result"] = result
+        return checked
+
+    @staticmethod
+    async def _ping_mongo() -> None:
+        await get_db_client().admin.command("ping")
+
+    @staticmethod
+    async def _ping_stripe() -> None:
+        await StripeGateway.call("Balance", "retrieve")
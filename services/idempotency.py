@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from typing import Annotated, Any, Awaitable, Callable
+from uuid import uuid4
+
+from fastapi import Depends, Header
+
+from core.cache import MISSING, TTLCache
+from core.config import settings
+
+# (operación, Idempotency-Key) -> (huella de los parámetros, respuesta de Stripe)
+response_cache = TTLCache(
+    "idempotency", settings.IDEMPOTENCY_CACHE_MAX_ENTRIES, settings.IDEMPOTENCY_CACHE_TTL_SECONDS
+)
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def resolve_idempotency_key(
+        idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_HEADER)
+) -> str:
+    """
+    Clave enviada por el cliente o, si no envía ninguna, una generada. Las rutas la devuelven
+    en la cabecera ``Idempotency-Key`` para que el cliente pueda repetir la petición sin
+    duplicar el cobro.
+    """
+    return idempotency_key or str(uuid4())
+
+
+IdempotencyKey = Annotated[str, Depends(resolve_idempotency_key)]
+
+
+def _fingerprint(params: dict[str, Any]) -> str:
+    return hashlib.sha256(
+        json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Respuestas de escrituras en Stripe indexadas por ``Idempotency-Key``: una repetición de
+    la misma petición devuelve el resultado guardado sin volver a llamar a Stripe.
+    """
+
+    _in_flight: dict[tuple[str, str], asyncio.Future] = {}
+
+    @staticmethod
+    async def run(
+            operation: str,
+            idempotency_key: str | None,
+            params: dict[str, Any],
+            create: Callable[[str], Awaitable[Any]]
+    ) -> Any:
+        """
+        Ejecuta una escritura una sola vez por clave de idempotencia.
+
+        :param operation: Nombre de la operación (ej. 'PaymentIntent.create').
+        :param idempotency_key: Clave enviada por el cliente; si falta se genera una.
+        :param params: Parámetros de la escritura.
+        :param create: Corrutina que recibe la clave y llama a Stripe.
+        :return: Respuesta de Stripe (original o guardada).
+        """
+        if not idempotency_key:
+            # Sin clave del cliente: la clave generada protege los reintentos internos
+            return await create(str(uuid4()))
+
+        cache_key = (operation, idempotency_key)
+        fingerprint = _fingerprint(params)
+
+        cached = response_cache.get(cache_key)
+        if cached is not MISSING:
+            IdempotencyStore._check(cached[0], fingerprint, idempotency_key)
+            return cached[1]
+
+        in_flight = IdempotencyStore._in_flight.get(cache_key)
+        if in_flight is not None:
+            # Repetición concurrente: espera a la petición original
+            stored_fingerprint, result = await asyncio.shield(in_flight)
+            IdempotencyStore._check(stored_fingerprint, fingerprint, idempotency_key)
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        IdempotencyStore._in_flight[cache_key] = future
+        try:
+            result = await create(idempotency_key)
+            response_cache.set(cache_key, (fingerprint, result))
+            future.set_result((fingerprint, result))
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del IdempotencyStore._in_flight[cache_key]
+
+    @staticmethod
+    def _check(stored: str, fingerprint: str, idempotency_key: str) -> None:
+        if stored != fingerprint:
+            raise ValueError(
+                f"La clave de idempotencia {idempotency_key} ya se usó con otros parámetros"
+            )
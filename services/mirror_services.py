@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Callable
+from uuid import uuid4
+
+from beanie import Document
+from bson import Binary
+from pymongo.errors import DuplicateKeyError
+
+from core.config import settings
+from core.profiling import profiled
+from models.customer_model import Customer, CustomerStatus
+from models.payment_model import PaymentIntent
+from models.price_model import Price
+from models.product_model import Product
+from models.subscription_model import Subscription
+
+
+def _customer_fields(obj: Any) -> dict[str, Any]:
+    return {
+        "email": obj.get("email"),
+        "name": obj.get("name") or "",
+        "phone": obj.get("phone"),
+        "metadata": obj.get("metadata") or {},
+        "status": (CustomerStatus.DELINQUENT if obj.get("delinquent")
+                   else CustomerStatus.ACTIVE).value,
+        "default_payment_method": (obj.get("invoice_settings") or {}).get(
+            "default_payment_method"),
+    }
+
+
+def _product_fields(obj: Any) -> dict[str, Any]:
+    return {
+        "name": obj.get("name") or "",
+        "active": obj.get("active", True),
+        "description": obj.get("description"),
+        "metadata": obj.get("metadata") or {},
+    }
+
+
+def _price_fields(obj: Any) -> dict[str, Any]:
+    return {
+        "product": obj.get("product"),
+        "active": obj.get("active", True),
+        "currency": obj.get("currency"),
+        "unit_amount": obj.get("unit_amount"),
+        "type": obj.get("type"),
+        "metadata": obj.get("metadata") or {},
+    }
+
+
+def _payment_intent_fields(obj: Any) -> dict[str, Any]:
+    return {
+        "customer": obj.get("customer"),
+        "amount": obj.get("amount"),
+        "currency": obj.get("currency"),
+        "status": obj.get("status"),
+    }
+
+
+def _subscription_fields(obj: Any) -> dict[str, Any]:
+    return {
+        "customer": obj.get("customer"),
+        "status": obj.get("status"),
+    }
+
+
+# Tipo de objeto de Stripe -> (documento, campo clave, extractor de campos)
+_MIRRORS: dict[str, tuple[type[Document], str, Callable[[Any], dict[str, Any]]]] = {
+    "customer": (Customer, "stripe_customer_id", _customer_fields),
+    "product": (Product, "_id", _product_fields),
+    "price": (Price, "_id", _price_fields),
+    "payment_intent": (PaymentIntent, "_id", _payment_intent_fields),
+    "subscription": (Subscription, "_id", _subscription_fields),
+}
+
+
+@profiled
+class MirrorServices:
+    """
+    Réplica local en MongoDB de los objetos de Stripe, sincronizada desde los webhooks.
+    """
+
+    @staticmethod
+    async def sync_event(event: Any) -> bool:
+        """
+        Aplica un evento de webhook a la réplica si su objeto es de un tipo replicado.
+
+        :param event: Evento de Stripe.
+        :return: True si el evento modificó la réplica.
+        """
+        obj = event.get("data", {}).get("object", {})
+        object_type = obj.get("object")
+        if object_type not in _MIRRORS:
+            return False
+
+        version = event.get("created") or 0
+        if event.get("type", "").endswith(".deleted") or obj.get("deleted"):
+            return await MirrorServices.delete(object_type, obj["id"], version)
+        return await MirrorServices.upsert(obj, version)
+
+    @staticmethod
+    async def upsert(obj: Any, version: int) -> bool:
+        """
+        Inserta o actualiza un objeto de Stripe en la réplica, solo si el evento no es más
+        antiguo que la versión ya almacenada.
+
+        :param obj: Objeto de Stripe.
+        :param version: Timestamp ('created') del evento que trae el objeto.
+        :return: True si se aplicó, False si el evento era obsoleto.
+        """
+        document, key, extract_fields = _MIRRORS[obj["object"]]
+        if document is Customer and not obj.get("email"):
+            # El índice local de clientes se consulta por email
+            return await MirrorServices.delete("customer", obj["id"], version)
+
+        fields = {
+            **extract_fields(obj),
+            "data": obj,
+            "version": version,
+            "deleted": False,
+            "updated_at": datetime.now(),
+        }
+        # Con la misma versión, la eliminación gana sobre la actualización
+        newer_or_live = {"$or": [
+            {"version": {"$not": {"$gte": version}}},
+            {"version": version, "deleted": {"$ne": True}},
+        ]}
+        return await MirrorServices._apply(
+            document, {key: obj["id"], **newer_or_live}, {"$set": fields}, key
+        )
+
+    @staticmethod
+    async def delete(object_type: str, stripe_id: str, version: int) -> bool:
+        """
+        Marca un objeto como eliminado en la réplica si el evento no es más antiguo que la
+        versión almacenada. El documento se conserva como tombstone con su versión, para que
+        un evento '*.updated' anterior que llegue tarde no vuelva a insertarlo.
+
+        :param object_type: Tipo de objeto de Stripe (ej. 'product').
+        :param stripe_id: ID del objeto en Stripe.
+        :param version: Timestamp ('created') del evento.
+        :return: True si se aplicó, False si el evento era obsoleto.
+        """
+        document, key, extract_fields = _MIRRORS[object_type]
+        update: dict[str, Any] = {"$set": {
+            "deleted": True,
+            "data": {},
+            "version": version,
+            "updated_at": datetime.now(),
+        }}
+        if document is Customer:
+            # Sin email, el tombstone no aparece en las búsquedas del índice local
+            update["$unset"] = {"email": ""}
+        else:
+            update["$setOnInsert"] = extract_fields({"active": False})
+        return await MirrorServices._apply(
+            document, {key: stripe_id, "version": {"$not": {"$gt": version}}}, update, key
+        )
+
+    @staticmethod
+    async def _apply(
+            document: type[Document],
+            query: dict[str, Any],
+            update: dict[str, Any],
+            key: str
+    ) -> bool:
+        if key != "_id":
+            update.setdefault("$setOnInsert", {}).update(
+                {"_id": Binary.from_uuid(uuid4()), "created_at": datetime.now()}
+            )
+        try:
+            await document.get_motor_collection().update_one(query, update, upsert=True)
+        except DuplicateKeyError:
+            # Ya existe una versión más reciente del objeto (o su tombstone)
+            return False
+        return True
+
+    @staticmethod
+    async def get(object_type: str, stripe_id: str) -> dict[str, Any] | None:
+        """
+        Obtiene un objeto de Stripe desde la réplica, si las lecturas desde la réplica están
+        habilitadas.
+
+        :param object_type: Tipo de objeto de Stripe (ej. 'product').
+        :param stripe_id: ID del objeto en Stripe.
+        :return: Objeto de Stripe almacenado o None si no está replicado.
+        """
+        if not settings.MIRROR_READS_ENABLED:
+            return None
+        document, key, _ = _MIRRORS[object_type]
+        stored = await document.get_motor_collection().find_one(
+            {key: stripe_id, "deleted": {"$ne": True}}, projection={"data": True}
+        )
+        return stored.get("data") or None if stored else None
@@ -1,17 +1,15 @@
-import stripe
 from stripe import PaymentMethod
 
-from core.config import settings
+from core.profiling import profiled
 from schemas.payment_method_schemas import (
     PaymentMethodCreate,
     PaymentMethodAttach,
     PaymentMethodDetach,
 )
-
-# Configura tu clave secreta de Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from services.stripe_gateway import StripeGateway
 
 
+@profiled
 class PaymentMethodServices:
 
     @staticmethod
@@ -23,7 +21,7 @@ class PaymentMethodServices:
         :return: Método de pago creado.
         """
         payment_method_object = payment_data.model_dump(exclude_unset=True)
-        payment_method = stripe.PaymentMethod.create(**payment_method_object)
+        payment_method = await StripeGateway.call("PaymentMethod", "create", **payment_method_object)
         return payment_method
 
     @staticmethod
@@ -34,7 +32,8 @@ class PaymentMethodServices:
         :param attach_data: Datos del método de pago y cliente.
         :return: Método de pago adjuntado.
         """
-        payment_method = stripe.PaymentMethod.attach(
+        payment_method = await StripeGateway.call(
+            "PaymentMethod", "attach",
             attach_data.payment_method_id,
             customer=attach_data.customer
         )
@@ -48,7 +47,9 @@ class PaymentMethodServices:
         :param detach_data: Datos del método de pago a desasociar.
         :return: Método de pago desasociado.
         """
-        payment_method = stripe.PaymentMethod.detach(detach_data.payment_method_id)
+        payment_method = await StripeGateway.call(
+            "PaymentMethod", "detach", detach_data.payment_method_id
+        )
         return payment_method
 
     @staticmethod
@@ -59,7 +60,7 @@ class PaymentMethodServices:
         :param payment_method_id: ID del método de pago.
         :return: Método de pago encontrado.
         """
-        payment_method = stripe.PaymentMethod.retrieve(payment_method_id)
+        payment_method = await StripeGateway.call("PaymentMethod", "retrieve", payment_method_id)
         return payment_method
 
     @staticmethod
@@ -71,5 +72,7 @@ class PaymentMethodServices:
         :param type: Tipo de método de pago (por defecto 'card').
         :return: Lista de métodos de pago.
         """
-        payment_methods = stripe.PaymentMethod.list(customer=customer, type=type)
+        payment_methods = await StripeGateway.call(
+            "PaymentMethod", "list", customer=customer, type=type
+        )
         return payment_methods["data"]
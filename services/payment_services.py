@@ -1,57 +1,107 @@
-import stripe
 from stripe import PaymentIntent, SetupIntent, Charge, Refund
 
 from core.config import settings
+from core.profiling import profiled
+from core.single_flight import SingleFlight
 from schemas.payment_schemas import (
     PaymentIntentCreate,
     SetupIntentCreate,
     ChargeCreate,
     RefundCreate,
 )
+from services.idempotency import IdempotencyStore
+from services.mirror_services import MirrorServices
+from services.stripe_gateway import StripeGateway, expand_params
 
-# Configura tu clave secreta de Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+# Lecturas concurrentes del mismo PaymentIntent comparten una sola llamada a Stripe
+payment_intent_flight = SingleFlight("payment_intent", settings.SINGLE_FLIGHT_WINDOW_SECONDS)
 
 
+@profiled
 class PaymentServices:
+    """
+    Las escrituras (PaymentIntent, SetupIntent, Charge, Refund) se envían a Stripe con una
+    clave de idempotencia, recibida del cliente o generada, para poder reintentarlas sin
+    duplicar cobros.
+    """
+
+    @staticmethod
+    async def _create(resource: str, params: dict, idempotency_key: str | None):
+        return await IdempotencyStore.run(
+            f"{resource}.create",
+            idempotency_key,
+            params,
+            lambda key: StripeGateway.call(resource, "create", idempotency_key=key, **params)
+        )
 
     # ------------- PaymentIntent Services -------------
 
     @staticmethod
-    async def create_payment_intent(payment_data: PaymentIntentCreate) -> PaymentIntent:
+    async def create_payment_intent(
+            payment_data: PaymentIntentCreate,
+            idempotency_key: str | None = None
+    ) -> PaymentIntent:
         """
         Crea un PaymentIntent en Stripe.
 
         :param payment_data: Datos del PaymentIntent a crear.
+        :param idempotency_key: Clave de idempotencia del cliente (opcional).
         :return: PaymentIntent creado.
         """
         payment_object = payment_data.model_dump(exclude_unset=True)
-        payment_intent = stripe.PaymentIntent.create(**payment_object)
+        payment_intent = await PaymentServices._create(
+            "PaymentIntent", payment_object, idempotency_key
+        )
         return payment_intent
 
     @staticmethod
-    async def retrieve_payment_intent(payment_intent_id: str) -> PaymentIntent:
+    async def retrieve_payment_intent(
+            payment_intent_id: str,
+            expand: tuple[str, ...] = ()
+    ) -> PaymentIntent:
         """
-        Obtiene un PaymentIntent por su ID.
+        Obtiene un PaymentIntent por su ID, desde la réplica local si está disponible.
 
         :param payment_intent_id: ID del PaymentIntent.
+        :param expand: Objetos relacionados a expandir en la misma llamada (ej. 'customer').
         :return: Datos del PaymentIntent.
         """
-        payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+        return await payment_intent_flight.do(
+            (payment_intent_id, expand),
+            lambda: PaymentServices._fetch_payment_intent(payment_intent_id, expand)
+        )
+
+    @staticmethod
+    async def _fetch_payment_intent(
+            payment_intent_id: str,
+            expand: tuple[str, ...] = ()
+    ) -> PaymentIntent:
+        # La réplica guarda el objeto sin expandir
+        if not expand:
+            payment_intent = await MirrorServices.get("payment_intent", payment_intent_id)
+            if payment_intent is not None:
+                return payment_intent
+        payment_intent = await StripeGateway.call(
+            "PaymentIntent", "retrieve", payment_intent_id, **expand_params(expand)
+        )
         return payment_intent
 
     # ------------- SetupIntent Services -------------
 
     @staticmethod
-    async def create_setup_intent(setup_data: SetupIntentCreate) -> SetupIntent:
+    async def create_setup_intent(
+            setup_data: SetupIntentCreate,
+            idempotency_key: str | None = None
+    ) -> SetupIntent:
         """
         Crea un SetupIntent en Stripe.
 
         :param setup_data: Datos del SetupIntent a crear.
+        :param idempotency_key: Clave de idempotencia del cliente (opcional).
         :return: SetupIntent creado.
         """
         setup_object = setup_data.model_dump(exclude_unset=True)
-        setup_intent = stripe.SetupIntent.create(**setup_object)
+        setup_intent = await PaymentServices._create("SetupIntent", setup_object, idempotency_key)
         return setup_intent
 
     @staticmethod
@@ -62,21 +112,25 @@ class PaymentServices:
         :param setup_intent_id: ID del SetupIntent.
         :return: Datos del SetupIntent.
         """
-        setup_intent = stripe.SetupIntent.retrieve(setup_intent_id)
+        setup_intent = await StripeGateway.call("SetupIntent", "retrieve", setup_intent_id)
         return setup_intent
 
     # ------------- Charge Services -------------
 
     @staticmethod
-    async def create_charge(charge_data: ChargeCreate) -> Charge:
+    async def create_charge(
+            charge_data: ChargeCreate,
+            idempotency_key: str | None = None
+    ) -> Charge:
         """
         Crea un Charge en Stripe.
 
         :param charge_data: Datos del Charge a crear.
+        :param idempotency_key: Clave de idempotencia del cliente (opcional).
         :return: Charge creado.
         """
         charge_object = charge_data.model_dump(exclude_unset=True)
-        charge = stripe.Charge.create(**charge_object)
+        charge = await PaymentServices._create("Charge", charge_object, idempotency_key)
         return charge
 
     @staticmethod
@@ -87,21 +141,25 @@ class PaymentServices:
         :param charge_id: ID del Charge.
         :return: Datos del Charge.
         """
-        charge = stripe.Charge.retrieve(charge_id)
+        charge = await StripeGateway.call("Charge", "retrieve", charge_id)
         return charge
 
     # ------------- Refund Services -------------
 
     @staticmethod
-    async def create_refund(refund_data: RefundCreate) -> Refund:
+    async def create_refund(
+            refund_data: RefundCreate,
+            idempotency_key: str | None = None
+    ) -> Refund:
         """
         Crea un Refund en Stripe.
 
         :param refund_data: Datos del Refund a crear.
+        :param idempotency_key: Clave de idempotencia del cliente (opcional).
         :return: Refund creado.
         """
         refund_object = refund_data.model_dump(exclude_unset=True)
-        refund = stripe.Refund.create(**refund_object)
+        refund = await PaymentServices._create("Refund", refund_object, idempotency_key)
         return refund
 
     @staticmethod
@@ -112,5 +170,5 @@ class PaymentServices:
         :param refund_id: ID del Refund.
         :return: Datos del Refund.
         """
-        refund = stripe.Refund.retrieve(refund_id)
+        refund = await StripeGateway.call("Refund", "retrieve", refund_id)
         return refund
@@ -1,13 +1,25 @@
-import stripe
-from typing import Any
+from typing import Any, AsyncIterator
 
+from core.cache import MISSING, TTLCache
 from core.config import settings
+from core.profiling import profiled
+from core.single_flight import SingleFlight
 from schemas.price_schemas import PriceCreate, PriceUpdate
+from services.mirror_services import MirrorServices
+from services.stripe_gateway import StripeGateway, expand_params
 
-# Configura tu clave secreta de Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+# Caché del catálogo: precios por ID (o (ID, expansiones)) y páginas del listado
+price_cache = TTLCache(
+    "price", settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_TTL_SECONDS
+)
+price_list_cache = TTLCache(
+    "price_list", settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_TTL_SECONDS
+)
+# Lecturas concurrentes del mismo precio comparten una sola llamada a Stripe
+price_flight = SingleFlight("price", settings.SINGLE_FLIGHT_WINDOW_SECONDS)
 
 
+@profiled
 class PriceServices:
 
     @staticmethod
@@ -20,7 +32,8 @@ class PriceServices:
         """
         # Convierte el esquema en un diccionario y envía los datos a Stripe
         price_object = price_data.model_dump(exclude_unset=True)
-        price = stripe.Price.create(**price_object)
+        price = await StripeGateway.call("Price", "create", **price_object)
+        price_list_cache.clear()
         return price
 
     @staticmethod
@@ -36,7 +49,8 @@ class PriceServices:
         update_data = price_data.model_dump(exclude_unset=True)
         if not update_data:
             raise ValueError("No hay datos válidos para actualizar el precio")
-        updated_price = stripe.Price.modify(price_id, **update_data)
+        updated_price = await StripeGateway.call("Price", "modify", price_id, **update_data)
+        PriceServices.invalidate_price(price_id)
         return updated_price
 
     @staticmethod
@@ -47,33 +61,118 @@ class PriceServices:
         :param price_id: ID del precio a eliminar.
         :return: Datos del precio eliminado.
         """
-        deleted_price = stripe.Price.modify(price_id, active=False)
+        deleted_price = await StripeGateway.call("Price", "modify", price_id, active=False)
+        PriceServices.invalidate_price(price_id)
         return deleted_price
 
     @staticmethod
-    async def get_price_by_id(price_id: str) -> dict[str, Any]:
+    async def get_price_by_id(price_id: str, expand: tuple[str, ...] = ()) -> dict[str, Any]:
         """
-        Obtiene un precio de Stripe por su ID.
+        Obtiene un precio por su ID: caché del catálogo, réplica local y, por último, Stripe.
 
         :param price_id: ID del precio.
+        :param expand: Objetos relacionados a expandir en la misma llamada (ej. 'product').
         :return: Datos del precio.
         """
-        price = stripe.Price.retrieve(price_id)
+        cache_key = (price_id, expand) if expand else price_id
+        price = price_cache.get(cache_key)
+        if price is MISSING:
+            # Todas las variantes de un precio comparten la generación de su ID
+            generation = price_cache.generation(price_id)
+            price = await price_flight.do(
+                cache_key, lambda: PriceServices._fetch_price(price_id, expand)
+            )
+            price_cache.set(cache_key, price, generation, generation_key=price_id)
         return price
 
     @staticmethod
-    async def list_prices(product_id: str = None, active_only: bool = True, limit: int = 100) -> list[dict[str, Any]]:
+    async def _fetch_price(price_id: str, expand: tuple[str, ...] = ()) -> dict[str, Any]:
+        # La réplica guarda el objeto sin expandir
+        price = None if expand else await MirrorServices.get("price", price_id)
+        if price is None:
+            price = await StripeGateway.call(
+                "Price", "retrieve", price_id, **expand_params(expand)
+            )
+        return price
+
+    @staticmethod
+    async def list_prices(
+            product_id: str = None,
+            active_only: bool = True,
+            limit: int = 100,
+            starting_after: str = None,
+            expand: tuple[str, ...] = ()
+    ) -> dict[str, Any]:
         """
-        Lista los precios de Stripe.
+        Lista una página de precios de Stripe.
 
         :param product_id: ID del producto relacionado (opcional).
         :param active_only: Filtra solo precios activos (opcional).
         :param limit: Número máximo de precios a obtener (opcional).
-        :return: Lista de precios.
+        :param starting_after: ID del último precio de la página anterior (opcional).
+        :param expand: Objetos relacionados a expandir en cada precio (opcional).
+        :return: Página de precios y cursor de la siguiente página.
+        """
+        cache_key = (product_id, active_only, limit, starting_after, expand)
+        page = price_list_cache.get(cache_key)
+        if page is MISSING:
+            generation = price_list_cache.generation(cache_key)
+            page = await StripeGateway.list_page(
+                "Price",
+                limit=limit,
+                starting_after=starting_after,
+                product=product_id,
+                active=active_only,
+                **expand_params(expand, in_list=True)
+            )
+            price_list_cache.set(cache_key, page, generation)
+        return page
+
+    @staticmethod
+    def iter_prices(
+            product_id: str = None,
+            active_only: bool = True,
+            expand: tuple[str, ...] = ()
+    ) -> AsyncIterator[list[Any]]:
+        """
+        Recorre todos los precios de Stripe página a página.
+
+        :param product_id: ID del producto relacionado (opcional).
+        :param active_only: Filtra solo precios activos (opcional).
+        :param expand: Objetos relacionados a expandir en cada precio (opcional).
+        :return: Generador asíncrono de páginas de precios.
+        """
+        return StripeGateway.paginate(
+            "Price", product=product_id, active=active_only, **expand_params(expand, in_list=True)
+        )
+
+    @staticmethod
+    def invalidate_price(price_id: str) -> None:
+        """
+        Elimina un precio de la caché del catálogo junto con las páginas del listado.
+
+        :param price_id: ID del precio modificado.
+        """
+        price_cache.invalidate(price_id)
+        price_cache.delete_where(lambda key, _: isinstance(key, tuple) and key[0] == price_id)
+        price_flight.forget_where(
+            lambda key: key == price_id or isinstance(key, tuple) and key[0] == price_id
+        )
+        price_list_cache.clear()
+
+    @staticmethod
+    def invalidate_product_expansions(product_id: str) -> None:
+        """
+        Elimina los precios en caché que llevan expandido un producto modificado.
+
+        :param product_id: ID del producto modificado.
         """
-        prices_response = stripe.Price.list(
-            product=product_id,
-            active=active_only,
-            limit=limit
+        price_cache.delete_where(
+            lambda key, price: isinstance(key, tuple) and _product_id(price) == product_id
         )
-        return prices_response.get("data", [])
+        price_list_cache.delete_where(lambda key, _: bool(key[-1]))
+
+
+def _product_id(price: dict[str, Any]) -> str | None:
+    product = price.get("product")
+    return product.get("id") if isinstance(product, dict) else product
@@ -1,12 +1,26 @@
-from typing import Any
+from typing import Any, AsyncIterator
 
-import stripe
+from core.cache import MISSING, TTLCache
 from core.config import settings
+from core.profiling import profiled
+from core.single_flight import SingleFlight
 from schemas.product_schemas import ProductCreate, ProductUpdate
-
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
-
+from services.mirror_services import MirrorServices
+from services.price_services import PriceServices
+from services.stripe_gateway import StripeGateway
+
+# Caché del catálogo: productos por ID y páginas del listado
+product_cache = TTLCache(
+    "product", settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_TTL_SECONDS
+)
+product_list_cache = TTLCache(
+    "product_list", settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_TTL_SECONDS
+)
+# Lecturas concurrentes del mismo producto comparten una sola llamada a Stripe
+product_flight = SingleFlight("product", settings.SINGLE_FLIGHT_WINDOW_SECONDS)
+
+
+@profiled
 class ProductServices:
 
     @staticmethod
@@ -18,7 +32,8 @@ class ProductServices:
         :return: Datos del producto creado.
         """
         product_object = product_data.model_dump(exclude_unset=True)
-        product = stripe.Product.create(**product_object)
+        product = await StripeGateway.call("Product", "create", **product_object)
+        product_list_cache.clear()
         return product
 
     @staticmethod
@@ -36,10 +51,12 @@ class ProductServices:
         if not update_data:
             raise ValueError("No hay datos válidos para actualizar el producto")
 
-        product = stripe.Product.modify(
+        product = await StripeGateway.call(
+            "Product", "modify",
             product_id,
             **update_data
         )
+        ProductServices.invalidate_product(product_id)
         return product
 
     @staticmethod
@@ -50,31 +67,79 @@ class ProductServices:
         :param product_id: ID del producto a eliminar.
         :return: Datos del producto eliminado.
         """
-        deleted_product = stripe.Product.delete(product_id)
+        deleted_product = await StripeGateway.call("Product", "delete", product_id)
+        ProductServices.invalidate_product(product_id)
         return deleted_product
 
     @staticmethod
     async def get_product_by_id(product_id: str) -> dict[str, Any]:
         """
-        Obtiene un producto de Stripe por su ID.
+        Obtiene un producto por su ID: caché del catálogo, réplica local y, por último, Stripe.
 
         :param product_id: ID del producto.
         :return: Datos del producto.
         """
-        product = stripe.Product.retrieve(product_id)
+        product = product_cache.get(product_id)
+        if product is MISSING:
+            generation = product_cache.generation(product_id)
+            product = await product_flight.do(
+                product_id, lambda: ProductServices._fetch_product(product_id)
+            )
+            product_cache.set(product_id, product, generation)
         return product
 
     @staticmethod
-    async def list_products(active_only: bool = True, limit: int = 100) -> list[dict[str, Any]]:
+    async def _fetch_product(product_id: str) -> dict[str, Any]:
+        product = await MirrorServices.get("product", product_id)
+        if product is None:
+            product = await StripeGateway.call("Product", "retrieve", product_id)
+        return product
+
+    @staticmethod
+    async def list_products(
+            active_only: bool = True,
+            limit: int = 100,
+            starting_after: str = None
+    ) -> dict[str, Any]:
         """
-        Lista todos los productos de Stripe.
+        Lista una página de productos de Stripe.
 
         :param active_only: Sí se debe filtrar por productos activos (opcional, por defecto True).
         :param limit: Número máximo de productos a obtener (opcional, por defecto 100).
-        :return: Lista de productos.
+        :param starting_after: ID del último producto de la página anterior (opcional).
+        :return: Página de productos y cursor de la siguiente página.
         """
-        products_response = stripe.Product.list(
-            active=active_only,
-            limit=limit
-        )
-        return products_response.get("data", [])
+        cache_key = (active_only, limit, starting_after)
+        page = product_list_cache.get(cache_key)
+        if page is MISSING:
+            generation = product_list_cache.generation(cache_key)
+            page = await StripeGateway.list_page(
+                "Product",
+                limit=limit,
+                starting_after=starting_after,
+                active=active_only
+            )
+            product_list_cache.set(cache_key, page, generation)
+        return page
+
+    @staticmethod
+    def iter_products(active_only: bool = True) -> AsyncIterator[list[Any]]:
+        """
+        Recorre todos los productos de Stripe página a página.
+
+        :param active_only: Sí se debe filtrar por productos activos (opcional, por defecto True).
+        :return: Generador asíncrono de páginas de productos.
+        """
+        return StripeGateway.paginate("Product", active=active_only)
+
+    @staticmethod
+    def invalidate_product(product_id: str) -> None:
+        """
+        Elimina un producto de la caché del catálogo junto con las páginas del listado.
+
+        :param product_id: ID del producto modificado.
+        """
+        product_cache.invalidate(product_id)
+        product_flight.forget(product_id)
+        product_list_cache.clear()
+        PriceServices.invalidate_product_expansions(product_id)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from pymongo.errors import DuplicateKeyError
+
+from core.config import settings
+from core.metrics import register_collector, render_family
+from models.rate_limit_model import RateLimitBucket
+
+# Métodos de los servicios de Stripe que consumen del bucket de lectura
+_READ_METHODS = {"retrieve", "list", "search"}
+
+
+class TokenBucket:
+    """
+    Token bucket en memoria con tasa adaptativa: cada 429 de Stripe pausa el bucket
+    (``Retry-After``) y reduce la tasa a la mitad; cada éxito la recupera poco a poco hasta
+    la tasa configurada.
+    """
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, name: str, rate: float, capacity: float) -> None:
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.waiting = 0
+        self.throttled = 0
+        self._tokens = capacity
+        self._updated_at = self.clock()
+        self._paused_until = 0.0
+
+    def _take(
+            self,
+            tokens: float,
+            updated_at: float,
+            paused_until: float,
+            now: float
+    ) -> tuple[float, float]:
+        """
+        Recarga el bucket y calcula si se puede consumir un token.
+
+        :return: (tokens restantes, segundos de espera); la espera es 0 si se consumió.
+        """
+        if paused_until > now:
+            return tokens, paused_until - now
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+        if tokens >= 1:
+            return tokens - 1, 0.0
+        return tokens, (1 - tokens) / self.rate
+
+    async def _reserve(self) -> float:
+        now = self.clock()
+        tokens, wait = self._take(self._tokens, self._updated_at, self._paused_until, now)
+        if wait <= 0:
+            self._tokens, self._updated_at = tokens, now
+        return wait
+
+    async def _pause(self, until: float) -> None:
+        self._paused_until = max(self._paused_until, until)
+
+    async def acquire(self) -> None:
+        """
+        Espera hasta obtener un token.
+        """
+        self.waiting += 1
+        try:
+            while (wait := await self._reserve()) > 0:
+                await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+
+    async def throttle(self, retry_after: float) -> None:
+        """
+        Registra un 429 de Stripe: pausa el bucket y reduce la tasa.
+
+        :param retry_after: Segundos que Stripe pidió esperar.
+        """
+        self.throttled += 1
+        self.rate = max(self.max_rate * settings.STRIPE_RATE_LIMIT_MIN_FACTOR, self.rate / 2)
+        await self._pause(self.clock() + retry_after)
+
+    def recover(self) -> None:
+        """
+        Registra una llamada exitosa: recupera la tasa de forma aditiva.
+        """
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "max_rate": self.max_rate,
+            "capacity": self.capacity,
+            "waiting": self.waiting,
+            "throttled": self.throttled,
+        }
+
+
+class MongoTokenBucket(TokenBucket):
+    """
+    Token bucket compartido por varios workers de uvicorn a través de MongoDB.
+
+    El estado (tokens y pausa) vive en la colección ``rate_limit_buckets`` y se actualiza
+    con control de concurrencia optimista; la tasa adaptativa es local a cada proceso.
+    """
+
+    clock = staticmethod(time.time)
+
+    async def _reserve(self) -> float:
+        collection = RateLimitBucket.get_motor_collection()
+        for _ in range(5):
+            now = self.clock()
+            stored = await collection.find_one({"_id": self.name})
+            if stored is None:
+                try:
+                    await collection.insert_one({
+                        "_id": self.name,
+                        "tokens": self.capacity - 1,
+                        "updated_at": now,
+                        "paused_until": 0.0,
+                    })
+                    return 0.0
+                except DuplicateKeyError:
+                    continue
+
+            tokens, wait = self._take(
+                stored["tokens"], stored["updated_at"], stored.get("paused_until", 0.0), now
+            )
+            if wait > 0:
+                return wait
+            result = await collection.update_one(
+                {"_id": self.name, "updated_at": stored["updated_at"]},
+                {"$set": {"tokens": tokens, "updated_at": now}},
+            )
+            if result.modified_count:
+                return 0.0
+        # Mucha contención entre workers: espera lo que tarda en recargarse un token
+        return 1 / self.rate
+
+    async def _pause(self, until: float) -> None:
+        await RateLimitBucket.get_motor_collection().update_one(
+            {"_id": self.name}, {"$max": {"paused_until": until}}
+        )
+
+
+class StripeRateLimiter:
+    """
+    Limitador de peticiones hacia Stripe con buckets separados de lectura y escritura.
+
+    El backend se elige con ``STRIPE_RATE_LIMIT_BACKEND``: 'local' (por proceso) o 'mongo'
+    (compartido entre workers).
+    """
+
+    _buckets: dict[str, TokenBucket] = {}
+
+    @staticmethod
+    def bucket(method: str) -> TokenBucket:
+        """
+        Obtiene el bucket correspondiente a un método de Stripe.
+
+        :param method: Método del servicio (ej. 'retrieve', 'create').
+        :return: Bucket de lectura o de escritura.
+        """
+        kind = "read" if method in _READ_METHODS else "write"
+        bucket = StripeRateLimiter._buckets.get(kind)
+        if bucket is None:
+            rate = (settings.STRIPE_READ_RATE_PER_SECOND if kind == "read"
+                    else settings.STRIPE_WRITE_RATE_PER_SECOND)
+            bucket_class = (MongoTokenBucket if settings.STRIPE_RATE_LIMIT_BACKEND == "mongo"
+                            else TokenBucket)
+            bucket = bucket_class(f"stripe:{kind}", rate, rate * settings.STRIPE_RATE_BURST_SECONDS)
+            StripeRateLimiter._buckets[kind] = bucket
+        return bucket
+
+    @staticmethod
+    def stats() -> dict[str, Any]:
+        return {
+            "backend": settings.STRIPE_RATE_LIMIT_BACKEND,
+            "queue_depth": sum(b.waiting for b in StripeRateLimiter._buckets.values()),
+            "buckets": {kind: b.stats() for kind, b in StripeRateLimiter._buckets.items()},
+        }
+
+
+register_collector(lambda: [
+    *render_family(
+        "stripe_rate_limit_waiting", "gauge", "Stripe calls waiting for a rate limit token.",
+        (({"bucket": b.name}, b.waiting) for b in StripeRateLimiter._buckets.values())
+    ),
+    *render_family(
+        "stripe_rate_limit_rate", "gauge", "Current adaptive Stripe request rate per second.",
+        (({"bucket": b.name}, b.rate) for b in StripeRateLimiter._buckets.values())
+    ),
+    *render_family(
+        "stripe_rate_limit_throttled_total", "counter", "Stripe 429 responses received.",
+        (({"bucket": b.name}, b.throttled) for b in StripeRateLimiter._buckets.values())
+    ),
+])
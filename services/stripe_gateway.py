@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import ssl
+import time
+from typing import Any, AsyncIterator
+
+import httpx
+import stripe
+
+from core.config import settings
+from core.metrics import stripe_call_duration, stripe_errors
+from core.profiling import span
+from services.rate_limiter import StripeRateLimiter
+
+# Nombre del recurso del SDK -> atributo del servicio en StripeClient
+_CLIENT_SERVICES = {
+    "Balance": "balance",
+    "Charge": "charges",
+    "Customer": "customers",
+    "PaymentIntent": "payment_intents",
+    "PaymentMethod": "payment_methods",
+    "Price": "prices",
+    "Product": "products",
+    "Refund": "refunds",
+    "SetupIntent": "setup_intents",
+    "Subscription": "subscriptions",
+}
+
+# Métodos de recurso cuyo nombre cambia en los servicios de StripeClient
+_CLIENT_METHODS = {
+    "modify": "update",
+}
+
+
+class PooledHTTPXClient(stripe.HTTPXClient):
+    """
+    Cliente HTTP de Stripe con un pool de conexiones persistente (keep-alive) y timeouts
+    configurables desde ``Settings``.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(
+            timeout=httpx.Timeout(
+                settings.STRIPE_READ_TIMEOUT,
+                connect=settings.STRIPE_CONNECT_TIMEOUT,
+            )
+        )
+        # El SDK ya creó un AsyncClient sin pool configurable; se cierra en close_async
+        self._default_client_async = self._client_async
+        # Un único contexto TLS compartido permite reutilizar las sesiones TLS del pool
+        self._client_async = httpx.AsyncClient(
+            verify=ssl.create_default_context(cafile=stripe.ca_bundle_path),
+            http2=settings.STRIPE_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.STRIPE_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.STRIPE_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.STRIPE_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    async def close_async(self) -> None:
+        await super().close_async()
+        await self._default_client_async.aclose()
+
+
+def retry_after(error: stripe.error.StripeError, attempt: int = 0) -> float:
+    """
+    Segundos a esperar tras un 429 de Stripe: la cabecera ``Retry-After`` si existe, o un
+    backoff exponencial con jitter.
+
+    :param error: Error devuelto por Stripe.
+    :param attempt: Número de intento (desde 0).
+    :return: Segundos de espera.
+    """
+    headers = error.headers or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return random.uniform(0.5, 1.0) * 2 ** attempt
+
+
+def expand_params(expand: tuple[str, ...], in_list: bool = False) -> dict[str, Any]:
+    """
+    Parámetro ``expand`` de Stripe; en los listados las expansiones llevan el prefijo 'data.'.
+
+    :param expand: Expansiones ya validadas.
+    :param in_list: True si la petición es un listado.
+    :return: Parámetros a agregar a la llamada (vacío si no hay expansiones).
+    """
+    if not expand:
+        return {}
+    return {"expand": [f"data.{e}" if in_list else e for e in expand]}
+
+
+def _is_transient(error: stripe.error.StripeError) -> bool:
+    """
+    Errores en los que Stripe no aplicó la petición o puede repetirse con la misma clave de
+    idempotencia: red, conflictos de bloqueo (409) y errores internos (5xx).
+    """
+    if isinstance(error, stripe.error.APIConnectionError):
+        return True
+    return error.http_status is not None and (error.http_status == 409 or error.http_status >= 500)
+
+
+def backoff(attempt: int) -> float:
+    """
+    Backoff exponencial con jitter completo.
+
+    :param attempt: Número de reintento (desde 0).
+    :return: Segundos de espera.
+    """
+    return random.uniform(0, min(settings.STRIPE_RETRY_MAX_SECONDS,
+                                 settings.STRIPE_RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+class StripeGateway:
+    """
+    Punto único de salida hacia Stripe para todos los servicios.
+
+    Usa un ``StripeClient`` compartido (creado en el lifespan de la aplicación) con los
+    métodos ``*_async`` para no bloquear el event loop, limita el número de llamadas
+    simultáneas con un semáforo configurable y la tasa de peticiones con los token buckets
+    de ``StripeRateLimiter``, reintentando las respuestas 429 de Stripe. Los errores
+    transitorios se reintentan con backoff en lecturas y en escrituras con clave de
+    idempotencia.
+    """
+
+    _client: stripe.StripeClient | None = None
+    _http_client: PooledHTTPXClient | None = None
+    _semaphore: asyncio.Semaphore | None = None
+
+    @staticmethod
+    def start() -> stripe.StripeClient:
+        """
+        Crea el ``StripeClient`` compartido con su pool de conexiones.
+
+        :return: Cliente de Stripe inyectado en los servicios.
+        """
+        if StripeGateway._client is None:
+            StripeGateway._http_client = PooledHTTPXClient()
+            base_addresses = {"api": settings.STRIPE_API_BASE} if settings.STRIPE_API_BASE else {}
+            StripeGateway._client = stripe.StripeClient(
+                settings.STRIPE_SECRET_KEY,
+                http_client=StripeGateway._http_client,
+                base_addresses=base_addresses,
+            )
+        return StripeGateway._client
+
+    @staticmethod
+    async def close() -> None:
+        """
+        Cierra el pool de conexiones del cliente compartido.
+        """
+        http_client = StripeGateway._http_client
+        StripeGateway._client = None
+        StripeGateway._http_client = None
+        if http_client is not None:
+            await http_client.close_async()
+
+    @staticmethod
+    def _get_semaphore() -> asyncio.Semaphore:
+        """
+        Crea el semáforo de concurrencia de forma perezosa, dentro del event loop activo.
+
+        :return: Semáforo compartido por todas las llamadas a Stripe.
+        """
+        if StripeGateway._semaphore is None:
+            StripeGateway._semaphore = asyncio.Semaphore(settings.STRIPE_MAX_CONCURRENCY)
+        return StripeGateway._semaphore
+
+    @staticmethod
+    async def call(
+            resource: str,
+            method: str,
+            *args: Any,
+            idempotency_key: str | None = None,
+            **params: Any
+    ) -> Any:
+        """
+        Ejecuta una operación de Stripe de forma asíncrona.
+
+        :param resource: Nombre del recurso del SDK (ej. 'Customer', 'PaymentIntent').
+        :param method: Método del recurso (ej. 'create', 'retrieve', 'modify').
+        :param args: Argumentos posicionales (normalmente el ID del objeto).
+        :param idempotency_key: Clave de idempotencia enviada a Stripe (escrituras).
+        :param params: Parámetros de la petición a Stripe.
+        :return: Objeto devuelto por Stripe.
+        """
+        service = getattr(StripeGateway.start(), _CLIENT_SERVICES[resource])
+        method = _CLIENT_METHODS.get(method, method)
+        operation = getattr(service, f"{method}_async")
+        bucket = StripeRateLimiter.bucket(method)
+        options = {"idempotency_key": idempotency_key} if idempotency_key else {}
+        retryable = bucket.name == "stripe:read" or idempotency_key is not None
+        call_name = f"{resource}.{method}"
+
+        throttles = retries = 0
+        while True:
+            async with span(f"rate_limit:{bucket.name}"):
+                await bucket.acquire()
+            try:
+                async with StripeGateway._get_semaphore(), span(f"stripe:{call_name}"):
+                    start = time.perf_counter()
+                    try:
+                        result = await operation(*args, params=params or None, options=options)
+                    except stripe.error.StripeError as e:
+                        stripe_call_duration.observe(
+                            call_name, "error", value=time.perf_counter() - start
+                        )
+                        stripe_errors.inc(call_name, type(e).__name__)
+                        raise
+                    stripe_call_duration.observe(
+                        call_name, "ok", value=time.perf_counter() - start
+                    )
+            except stripe.error.RateLimitError as e:
+                if throttles == settings.STRIPE_RATE_LIMIT_MAX_RETRIES:
+                    raise
+                await bucket.throttle(retry_after(e, throttles))
+                throttles += 1
+                continue
+            except stripe.error.StripeError as e:
+                if not (retryable and _is_transient(e)) or retries == settings.STRIPE_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(backoff(retries))
+                retries += 1
+                continue
+            bucket.recover()
+            return result
+
+    @staticmethod
+    async def list_page(
+            resource: str,
+            limit: int = 100,
+            starting_after: str | None = None,
+            **params: Any
+    ) -> dict[str, Any]:
+        """
+        Obtiene una página de un listado de Stripe con paginación por cursor.
+
+        :param resource: Nombre del recurso del SDK (ej. 'Customer').
+        :param limit: Número máximo de objetos de la página (1-100).
+        :param starting_after: ID del último objeto de la página anterior (opcional).
+        :param params: Filtros adicionales del listado.
+        :return: Página con los objetos y el cursor de la siguiente página.
+        """
+        page = await StripeGateway.call(
+            resource, "list", limit=limit, starting_after=starting_after, **params
+        )
+        items = page.get("data", [])
+        has_more = bool(page.get("has_more")) and len(items) > 0
+        return {
+            "object": "list",
+            "items": items,
+            "total": len(items),
+            "has_more": has_more,
+            "next_starting_after": items[-1]["id"] if has_more else None,
+        }
+
+    @staticmethod
+    async def paginate(resource: str, **params: Any) -> AsyncIterator[list[Any]]:
+        """
+        Recorre todas las páginas de un listado de Stripe, una página a la vez.
+
+        :param resource: Nombre del recurso del SDK (ej. 'Customer').
+        :param params: Filtros adicionales del listado.
+        :return: Generador asíncrono de páginas (listas de objetos).
+        """
+        starting_after = None
+        while True:
+            page = await StripeGateway.list_page(resource, starting_after=starting_after, **params)
+            if page["items"]:
+                yield page["items"]
+            if not page["has_more"]:
+                return
+            starting_after = page["next_starting_after"]
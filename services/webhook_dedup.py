@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from pymongo.errors import DuplicateKeyError
+
+from core.cache import MISSING, TTLCache
+from core.config import settings
+from core.metrics import register_collector, render_family
+from models.processed_event_model import ProcessedEvent, ProcessedEventStatus
+
+# IDs de eventos ya procesados, delante del índice único de MongoDB
+processed_cache = TTLCache(
+    "webhook_dedup", settings.WEBHOOK_DEDUP_MEMORY_ENTRIES, settings.WEBHOOK_DEDUP_TTL_SECONDS
+)
+
+
+class EventClaimedElsewhere(Exception):
+    """
+    Otro worker tiene un claim vigente sobre el evento. Es reintentable: la cola lo reprograma
+    con backoff y, si ese worker muere, el evento se retoma al vencer su lease.
+    """
+
+
+class WebhookDeduplicator:
+    """
+    Garantiza que cada evento de Stripe (por ``event.id``) se procese una sola vez, aunque
+    Stripe lo entregue varias veces.
+
+    Antes de procesar se inserta un ``ProcessedEvent`` en estado 'processing' con un lease
+    (``_id`` único): entre procesos solo gana quien lo inserta. Si el procesamiento falla se
+    elimina el claim para que los reintentos de la cola vuelvan a ejecutarlo; si el proceso
+    muere, otro worker lo retoma cuando vence el lease. Solo un claim 'processed' cuenta como
+    duplicado; uno 'processing' ajeno lanza ``EventClaimedElsewhere`` para que se reintente.
+    """
+
+    _in_flight: dict[str, asyncio.Future] = {}
+    _stats = {"store_hits": 0, "collapsed": 0, "processed": 0, "claimed_elsewhere": 0}
+
+    @staticmethod
+    async def run_once(
+            event_id: str,
+            event_type: str,
+            dispatch: Callable[[], Awaitable[Any]]
+    ) -> dict[str, Any]:
+        """
+        Ejecuta el procesamiento de un evento solo si no se ha procesado antes.
+
+        :param event_id: ID del evento de Stripe.
+        :param event_type: Tipo del evento.
+        :param dispatch: Corrutina que procesa el evento.
+        :return: Resultado del procesamiento o indicación de duplicado.
+        :raises EventClaimedElsewhere: Si otro worker está procesando el evento.
+        """
+        if processed_cache.get(event_id) is not MISSING:
+            return {"duplicate": True}
+
+        in_flight = WebhookDeduplicator._in_flight.get(event_id)
+        if in_flight is not None:
+            # Entrega concurrente del mismo evento: comparte el resultado
+            WebhookDeduplicator._stats["collapsed"] += 1
+            await asyncio.shield(in_flight)
+            return {"duplicate": True}
+
+        future = asyncio.get_running_loop().create_future()
+        WebhookDeduplicator._in_flight[event_id] = future
+        try:
+            claim = await WebhookDeduplicator._claim(event_id, event_type)
+            if claim == ProcessedEventStatus.PROCESSING:
+                WebhookDeduplicator._stats["claimed_elsewhere"] += 1
+                raise EventClaimedElsewhere(event_id)
+            if claim == ProcessedEventStatus.PROCESSED:
+                WebhookDeduplicator._stats["store_hits"] += 1
+                processed_cache.set(event_id, True)
+                result = {"duplicate": True}
+            else:
+                try:
+                    result = await dispatch()
+                except BaseException:
+                    await WebhookDeduplicator._release(event_id)
+                    raise
+                await WebhookDeduplicator._complete(event_id)
+                processed_cache.set(event_id, True)
+                WebhookDeduplicator._stats["processed"] += 1
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # Evita el aviso de excepción no recuperada si nadie más esperaba el evento
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del WebhookDeduplicator._in_flight[event_id]
+
+    @staticmethod
+    async def _claim(event_id: str, event_type: str) -> ProcessedEventStatus | None:
+        """
+        Reclama el evento para este worker.
+
+        :return: None si el claim es nuestro; si no, el estado del claim existente.
+        """
+        collection = ProcessedEvent.get_motor_collection()
+        now = datetime.now()
+        locked_until = now + timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS)
+        try:
+            await ProcessedEvent(
+                id=event_id,
+                event_type=event_type,
+                status=ProcessedEventStatus.PROCESSING,
+                locked_until=locked_until,
+            ).insert()
+            return None
+        except DuplicateKeyError:
+            pass
+        # Claim de un worker que murió sin terminar: se retoma al vencer el lease
+        taken = await collection.update_one(
+            {
+                "_id": event_id,
+                "status": ProcessedEventStatus.PROCESSING.value,
+                "locked_until": {"$lt": now},
+            },
+            {"$set": {"locked_until": locked_until, "processed_at": now}},
+        )
+        if taken.modified_count:
+            return None
+        existing = await collection.find_one({"_id": event_id}, projection={"status": True})
+        if existing is None:
+            # El otro worker falló y liberó el claim entre medias
+            return await WebhookDeduplicator._claim(event_id, event_type)
+        return ProcessedEventStatus(existing.get("status", ProcessedEventStatus.PROCESSED))
+
+    @staticmethod
+    async def _complete(event_id: str) -> None:
+        await ProcessedEvent.get_motor_collection().update_one(
+            {"_id": event_id},
+            {
+                "$set": {
+                    "status": ProcessedEventStatus.PROCESSED.value,
+                    "processed_at": datetime.now(),
+                },
+                "$unset": {"locked_until": ""},
+            },
+        )
+
+    @staticmethod
+    async def _release(event_id: str) -> None:
+        # Sin claim, el reintento de la cola vuelve a procesar el evento
+        await ProcessedEvent.get_motor_collection().delete_one(
+            {"_id": event_id, "status": ProcessedEventStatus.PROCESSING.value}
+        )
+
+    @staticmethod
+    def stats() -> dict[str, Any]:
+        """
+        Métricas de deduplicación.
+
+        :return: Aciertos en memoria y en MongoDB, entregas colapsadas, eventos procesados y
+            entregas reprogramadas porque otro worker tenía el claim.
+        """
+        stats = {
+            **WebhookDeduplicator._stats,
+            "memory_hits": processed_cache.hits,
+            "in_flight": len(WebhookDeduplicator._in_flight),
+        }
+        duplicates = stats["memory_hits"] + stats["store_hits"] + stats["collapsed"]
+        deliveries = duplicates + stats["processed"]
+        stats["hit_rate"] = duplicates / deliveries if deliveries else 0.0
+        return stats
+
+
+# Entregas por resultado: procesadas, duplicadas (memoria, MongoDB o colapsadas en este
+# proceso) y reprogramadas porque otro worker tenía el claim
+_DEDUP_OUTCOMES = {
+    "processed": "processed",
+    "memory_hit": "memory_hits",
+    "store_hit": "store_hits",
+    "collapsed": "collapsed",
+    "claimed_elsewhere": "claimed_elsewhere",
+}
+
+
+def _dedup_samples() -> list[str]:
+    stats = WebhookDeduplicator.stats()
+    return [
+        *render_family(
+            "webhook_dedup_deliveries_total", "counter",
+            "Webhook deliveries by deduplication outcome.",
+            (({"outcome": outcome}, stats[key]) for outcome, key in _DEDUP_OUTCOMES.items())
+        ),
+        *render_family(
+            "webhook_dedup_hit_ratio", "gauge",
+            "Share of webhook deliveries skipped as duplicates.",
+            [({}, stats["hit_rate"])]
+        ),
+        *render_family(
+            "webhook_dedup_in_flight", "gauge", "Webhook events being processed in this process.",
+            [({}, stats["in_flight"])]
+        ),
+    ]
+
+
+register_collector(_dedup_samples)
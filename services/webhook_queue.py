@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from pymongo import ReturnDocument
+
+from core import fast_json
+from core.config import settings
+from core.event_log import log_event
+from core.metrics import register_collector, render_family
+from models.webhook_event_model import WebhookEvent, WebhookEventStatus
+
+
+class WebhookQueue:
+    """
+    Cola durable (colección ``webhook_events``) para procesar los webhooks fuera de la petición.
+
+    El endpoint solo verifica y persiste el evento; un grupo de workers iniciado en el lifespan
+    lo procesa con reintentos y backoff exponencial. Los eventos que agotan sus intentos quedan
+    en estado 'dead' (dead-letter queue).
+    """
+
+    _workers: list[asyncio.Task] = []
+    _wakeup: asyncio.Event | None = None
+
+    @staticmethod
+    async def enqueue(event_id: str, event_type: str, payload: str) -> None:
+        """
+        Persiste un evento verificado para su procesamiento asíncrono.
+
+        :param event_id: ID del evento de Stripe.
+        :param event_type: Tipo del evento (ej. 'payment_intent.succeeded').
+        :param payload: Cuerpo crudo del webhook.
+        """
+        await WebhookEvent(event_id=event_id, event_type=event_type, payload=payload).insert()
+        if WebhookQueue._wakeup is not None:
+            WebhookQueue._wakeup.set()
+
+    @staticmethod
+    def start(processor: Callable[[dict], Awaitable[Any]]) -> None:
+        """
+        Inicia los workers que drenan la cola.
+
+        :param processor: Corrutina que procesa un evento ya decodificado.
+        """
+        WebhookQueue._wakeup = asyncio.Event()
+        WebhookQueue._workers = [
+            asyncio.create_task(WebhookQueue._worker(processor))
+            for _ in range(settings.WEBHOOK_WORKERS)
+        ]
+
+    @staticmethod
+    async def stop() -> None:
+        """
+        Detiene los workers. Los eventos en curso vuelven a la cola al expirar su lease.
+        """
+        for worker in WebhookQueue._workers:
+            worker.cancel()
+        await asyncio.gather(*WebhookQueue._workers, return_exceptions=True)
+        WebhookQueue._workers = []
+
+    @staticmethod
+    async def backlog() -> dict[str, int]:
+        """
+        Cuenta los eventos pendientes, en proceso y en la dead-letter queue.
+
+        :return: Número de eventos por estado.
+        """
+        collection = WebhookEvent.get_motor_collection()
+        return {
+            status.value: await collection.count_documents({"status": status.value})
+            for status in WebhookEventStatus
+        }
+
+    @staticmethod
+    async def _claim() -> dict | None:
+        """
+        Reserva atómicamente el siguiente evento disponible (o uno cuyo lease expiró).
+
+        :return: Documento crudo del evento o None si la cola está vacía.
+        """
+        now = datetime.now()
+        return await WebhookEvent.get_motor_collection().find_one_and_update(
+            {"$or": [
+                {"status": WebhookEventStatus.PENDING.value, "available_at": {"$lte": now}},
+                {"status": WebhookEventStatus.PROCESSING.value, "locked_until": {"$lte": now}},
+            ]},
+            {
+                "$set": {
+                    "status": WebhookEventStatus.PROCESSING.value,
+                    "locked_until": now + timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    async def _fail(job: dict, error: Exception) -> None:
+        """
+        Reprograma un evento fallido con backoff exponencial o lo envía a la dead-letter queue.
+
+        :param job: Documento crudo del evento.
+        :param error: Excepción lanzada por el procesador.
+        """
+        update: dict[str, Any] = {"last_error": repr(error), "locked_until": None}
+        if job["attempts"] >= settings.WEBHOOK_MAX_ATTEMPTS:
+            log_event(logging.ERROR, "webhook_queue.dead_letter", event_id=job["event_id"],
+                      event_type=job["event_type"], attempts=job["attempts"], error=repr(error))
+            update["status"] = WebhookEventStatus.DEAD.value
+        else:
+            delay = min(
+                settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1),
+                settings.WEBHOOK_RETRY_MAX_SECONDS,
+            )
+            update["status"] = WebhookEventStatus.PENDING.value
+            update["available_at"] = datetime.now() + timedelta(
+                seconds=random.uniform(delay / 2, delay)
+            )
+        await WebhookEvent.get_motor_collection().update_one({"_id": job["_id"]}, {"$set": update})
+
+    @staticmethod
+    async def _worker(processor: Callable[[dict], Awaitable[Any]]) -> None:
+        """
+        Bucle de un worker: reserva, procesa y confirma eventos hasta ser cancelado.
+
+        :param processor: Corrutina que procesa un evento ya decodificado.
+        """
+        while True:
+            try:
+                job = await WebhookQueue._claim()
+            except Exception as e:
+                log_event(logging.ERROR, "webhook_queue.claim_failed", error=repr(e))
+                await asyncio.sleep(settings.WEBHOOK_POLL_INTERVAL_SECONDS)
+                continue
+
+            if job is None:
+                WebhookQueue._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        WebhookQueue._wakeup.wait(), settings.WEBHOOK_POLL_INTERVAL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                try:
+                    await processor(fast_json.loads(job["payload"]))
+                except Exception as e:
+                    await WebhookQueue._fail(job, e)
+                else:
+                    await WebhookEvent.get_motor_collection().delete_one({"_id": job["_id"]})
+            except Exception as e:
+                # El lease expirará y el evento se reintentará
+                log_event(logging.ERROR, "webhook_queue.ack_failed",
+                          event_id=job["event_id"], error=repr(e))
+
+
+async def _queue_samples() -> list[str]:
+    try:
+        backlog = await WebhookQueue.backlog()
+    except Exception as e:
+        # Sin MongoDB se omite la profundidad de la cola; el resto de /metrics sigue sirviéndose
+        log_event(logging.WARNING, "webhook_queue.metrics_failed", error=repr(e))
+        return []
+    return render_family(
+        "webhook_queue_events", "gauge", "Webhook events in the durable queue by status.",
+        (({"status": status}, count) for status, count in backlog.items())
+    )
+
+
+register_collector(_queue_samples)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+Handler = Callable[[Any], Awaitable[Any]]
+OrderingKey = Callable[[dict], Hashable]
+
+
+class _KeyedLocks:
+    """
+    Un lock por clave de ordenamiento, liberado cuando nadie lo usa.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+
+class _MicroBatcher:
+    """
+    Agrupa eventos del mismo tipo y llama al handler con una lista de objetos, cuando se
+    alcanza ``size`` o transcurre ``window`` segundos desde el primer evento del lote.
+    Con ``concurrency`` 1 los lotes se procesan en orden de llegada.
+    """
+
+    def __init__(self, handler: Handler, size: int, window: float, concurrency: int) -> None:
+        self._handler = handler
+        self._size = size
+        self._window = window
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._timer: asyncio.Task | None = None
+        self._flushes = asyncio.Semaphore(concurrency)
+
+    async def submit(self, data: dict) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((data, future))
+        if len(self._pending) >= self._size:
+            await self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._window)
+        self._timer = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        # Un flush por tamaño cancela el temporizador del lote que acaba de salir
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        async with self._flushes:
+            try:
+                result = await self._handler([data for data, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(result)
+
+
+class _Route:
+    def __init__(
+            self,
+            handler: Handler,
+            concurrency: int | None,
+            ordering_key: OrderingKey | None,
+            batch_size: int,
+            batch_window: float
+    ) -> None:
+        self.handler = handler
+        self.concurrency = concurrency
+        self.ordering_key = ordering_key
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._semaphore: asyncio.Semaphore | None = None
+        self._locks = _KeyedLocks()
+        self._batcher: _MicroBatcher | None = None
+
+    async def dispatch(self, data: dict) -> Any:
+        if self.batch_size > 1:
+            if self._batcher is None:
+                self._batcher = _MicroBatcher(
+                    self.handler, self.batch_size, self.batch_window, self.concurrency or 1
+                )
+            return await self._batcher.submit(data)
+
+        if self.concurrency and self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        if self._semaphore is not None:
+            async with self._semaphore:
+                return await self.handler(data)
+        return await self.handler(data)
+
+    @asynccontextmanager
+    async def ordered(self, data: dict) -> AsyncIterator[None]:
+        key = self.ordering_key(data) if self.ordering_key else None
+        if key is None:
+            yield
+            return
+        async with self._locks.hold(key):
+            yield
+
+
+class WebhookRegistry:
+    """
+    Registro de handlers de webhooks, construido una sola vez al importar los servicios.
+
+    Cada tipo de evento puede definir su límite de concurrencia, una clave de ordenamiento
+    (los eventos con la misma clave se procesan en serie) y micro-batching.
+
+    El orden es best-effort: los eventos con la misma clave se procesan en el orden en que
+    los workers de este proceso entran en ``ordered()``, que debe llamarse antes de cualquier
+    E/S del evento. Un evento reintentado por la cola se procesa después de los que llegaron
+    mientras tanto, y entre procesos distintos no hay orden; los handlers que dependen del
+    orden deben comparar versiones (como la réplica, con ``event.created``).
+    """
+
+    def __init__(self) -> None:
+        self._routes: dict[str, _Route] = {}
+
+    def register(
+            self,
+            *event_types: str,
+            concurrency: int | None = None,
+            ordering_key: OrderingKey | None = None,
+            batch_size: int = 1,
+            batch_window: float = 0.5
+    ) -> Callable[[Handler], Handler]:
+        """
+        Decorador que registra un handler para uno o varios tipos de evento.
+
+        :param event_types: Tipos de evento (ej. 'invoice.paid').
+        :param concurrency: Máximo de eventos (o lotes) de este tipo procesándose a la vez.
+        :param ordering_key: Función data -> clave; los eventos con la misma clave se procesan
+            en orden (ej. por ID de cliente).
+        :param batch_size: Si es mayor que 1, el handler recibe listas de hasta este tamaño.
+        :param batch_window: Segundos máximos de espera para completar un lote.
+        :return: El handler sin modificar.
+        """
+        def decorator(handler: Handler) -> Handler:
+            for event_type in event_types:
+                self._routes[event_type] = _Route(
+                    handler, concurrency, ordering_key, batch_size, batch_window
+                )
+            return handler
+        return decorator
+
+    def handles(self, event_type: str) -> bool:
+        return event_type in self._routes
+
+    @asynccontextmanager
+    async def ordered(self, event_type: str, data: dict) -> AsyncIterator[None]:
+        """
+        Serializa el procesamiento de los eventos con la misma clave de ordenamiento.
+
+        :param event_type: Tipo del evento.
+        :param data: Objeto del evento (``event.data.object``).
+        """
+        route = self._routes.get(event_type)
+        if route is None:
+            yield
+            return
+        async with route.ordered(data):
+            yield
+
+    async def dispatch(self, event_type: str, data: dict) -> Any:
+        """
+        Ejecuta el handler registrado para el tipo de evento.
+
+        :param event_type: Tipo del evento.
+        :param data: Objeto del evento (``event.data.object``).
+        :return: Resultado del handler.
+        """
+        return await self._routes[event_type].dispatch(data)
+
+
+webhook_registry = WebhookRegistry()
@@ -1,9 +1,19 @@
+import logging
+
 import stripe
 from fastapi import Request, HTTPException, status
 from core.config import settings
-
-# Configura tu clave secreta de Stripe y la clave del webhook
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from core.event_log import log_event
+from services.catalog_services import CatalogServices
+from services.mirror_services import MirrorServices
+from services.price_services import PriceServices
+from services.product_services import ProductServices
+from services.webhook_dedup import WebhookDeduplicator
+from services.webhook_queue import WebhookQueue
+from services.webhook_registry import webhook_registry
+from services.webhook_verification import WebhookVerifier
+
+# Clave para verificar la firma de los webhooks (las llamadas a Stripe usan StripeGateway)
 WEBHOOK_SECRET = settings.STRIPE_WEBHOOK_SECRET
 
 
@@ -12,10 +22,13 @@ class WebhookServices:
     @staticmethod
     async def handle_webhook(request: Request):
         """
-        Maneja los eventos de webhook de Stripe.
+        Verifica un webhook de Stripe y lo encola para su procesamiento asíncrono.
+
+        Solo los errores de firma o de payload responden 400; si no se puede persistir el
+        evento se responde 503 para que Stripe reintente la entrega.
 
         :param request: Objeto de solicitud (request) de FastAPI.
-        :return: Respuesta con el manejo del evento.
+        :return: Confirmación de recepción del evento.
         """
         try:
             # Obtén el payload del webhook
@@ -29,12 +42,9 @@ class WebhookServices:
                     detail="Firma de Stripe ausente"
                 )
 
-            # Construir el evento usando la clave secreta del webhook
-            event = stripe.Webhook.construct_event(
-                payload=payload,
-                sig_header=sig_header,
-                secret=WEBHOOK_SECRET
-            )
+            # Verifica la firma y decodifica el evento (en un hilo si el payload es grande)
+            event = await WebhookVerifier.verify_and_parse(payload, sig_header, WEBHOOK_SECRET)
+            raw_payload = payload.decode("utf-8")
 
         except ValueError as e:
             # Maneja errores en el cuerpo de la solicitud
@@ -49,13 +59,40 @@ class WebhookServices:
                 detail="Firma de webhook inválida"
             )
 
-        # Procesa el evento
-        return await WebhookServices.process_event(event)
+        # Persiste el evento; los workers de la cola lo procesan fuera de la petición
+        try:
+            await WebhookQueue.enqueue(event["id"], event["type"], raw_payload)
+        except Exception as e:
+            log_event(logging.ERROR, "webhook.enqueue_failed", event_id=event["id"],
+                      event_type=event["type"], error=repr(e))
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="No se pudo registrar el evento"
+            ) from e
+        return {"received": True}
 
     @staticmethod
     async def process_event(event: dict):
         """
-        Procesa el evento del webhook.
+        Procesa el evento del webhook una sola vez por ``event.id``; las entregas repetidas
+        de Stripe se confirman sin volver a ejecutar los handlers.
+
+        :param event: Evento del webhook.
+        :return: Respuesta con el manejo del evento.
+        """
+        # El lock de ordenamiento se toma antes de cualquier E/S (deduplicación y réplica)
+        data = event.get("data", {}).get("object", {})
+        async with webhook_registry.ordered(event.get("type"), data):
+            return await WebhookDeduplicator.run_once(
+                event["id"],
+                event.get("type"),
+                lambda: WebhookServices.dispatch_event(event)
+            )
+
+    @staticmethod
+    async def dispatch_event(event: dict):
+        """
+        Ejecuta el handler asociado al tipo del evento.
 
         :param event: Evento del webhook.
         :return: Respuesta con el manejo del evento.
@@ -63,59 +100,95 @@ class WebhookServices:
         event_type = event.get("type")
         data = event.get("data", {}).get("object", {})
 
-        # Diccionario de eventos y funciones asociadas
-        event_handlers = {
-            "payment_intent.succeeded": WebhookServices.handle_payment_intent_succeeded,
-            "checkout.session.completed": WebhookServices.handle_checkout_session_completed,
-            "customer.subscription.created": WebhookServices.handle_subscription_created,
-            "product.updated": WebhookServices.handle_product_updated,
-            "price.updated": WebhookServices.handle_price_updated,
-            # Agrega aquí más eventos según sea necesario
-        }
-
-        # Llama a la función asociada al evento si existe
-        handler = event_handlers.get(event_type)
-        if handler:
-            return await handler(data)
+        # Sincroniza la réplica local (clientes, productos, precios, pagos, suscripciones)
+        await MirrorServices.sync_event(event)
+
+        # Llama al handler registrado para el evento si existe
+        if webhook_registry.handles(event_type):
+            return await webhook_registry.dispatch(event_type, data)
         else:
-            return {"message": f"Evento {event_type} no manejado", "data": data}
+            return {"message": f"Evento {event_type} no manejado"}
+
+    # Los handlers se registran con @webhook_registry.register; agrega aquí más eventos
+    # según sea necesario.
 
     @staticmethod
+    @webhook_registry.register(
+        "payment_intent.succeeded",
+        ordering_key=lambda data: data.get("customer")
+    )
     async def handle_payment_intent_succeeded(data: dict):
         """
         Maneja el evento 'payment_intent.succeeded'.
         """
-        print(f"Pago exitoso: {data}")
-        return {"message": "Pago exitoso procesado", "data": data}
+        log_event(logging.INFO, "payment_intent.succeeded", id=data.get("id"),
+                  amount=data.get("amount"), currency=data.get("currency"))
+        return {"message": "Pago exitoso procesado"}
 
     @staticmethod
+    @webhook_registry.register(
+        "checkout.session.completed",
+        ordering_key=lambda data: data.get("customer")
+    )
     async def handle_checkout_session_completed(data: dict):
         """
         Maneja el evento 'checkout.session.completed'.
         """
-        print(f"Sesión completada: {data}")
-        return {"message": "Sesión de checkout completada", "data": data}
+        log_event(logging.INFO, "checkout.session.completed", id=data.get("id"),
+                  customer=data.get("customer"))
+        return {"message": "Sesión de checkout completada"}
 
     @staticmethod
+    @webhook_registry.register(
+        "customer.subscription.created",
+        ordering_key=lambda data: data.get("customer")
+    )
     async def handle_subscription_created(data: dict):
         """
         Maneja el evento 'customer.subscription.created'.
         """
-        print(f"Suscripción creada: {data}")
-        return {"message": "Suscripción creada correctamente", "data": data}
+        log_event(logging.INFO, "customer.subscription.created", id=data.get("id"),
+                  customer=data.get("customer"))
+        return {"message": "Suscripción creada correctamente"}
 
     @staticmethod
+    @webhook_registry.register("product.updated", ordering_key=lambda data: data.get("id"))
     async def handle_product_updated(data: dict):
         """
         Maneja el evento 'product.updated'.
         """
-        print(f"Producto actualizado: {data}")
-        return {"message": "Producto actualizado", "data": data}
+        log_event(logging.INFO, "product.updated", id=data.get("id"))
+        ProductServices.invalidate_product(data["id"])
+        CatalogServices.apply_product(data)
+        return {"message": "Producto actualizado"}
 
     @staticmethod
+    @webhook_registry.register("price.updated", ordering_key=lambda data: data.get("id"))
     async def handle_price_updated(data: dict):
         """
         Maneja el evento 'price.updated'.
         """
-        print(f"Precio actualizado: {data}")
-        return {"message": "Precio actualizado", "data": data}
+        log_event(logging.INFO, "price.updated", id=data.get("id"))
+        PriceServices.invalidate_price(data["id"])
+        CatalogServices.apply_price(data)
+        return {"message": "Precio actualizado"}
+
+    @staticmethod
+    @webhook_registry.register("invoice.paid", concurrency=4, batch_size=25, batch_window=0.2)
+    async def handle_invoices_paid(batch: list[dict]):
+        """
+        Maneja lotes de eventos 'invoice.paid'.
+        """
+        log_event(logging.INFO, "invoice.paid", count=len(batch),
+                  ids=[data.get("id") for data in batch])
+        return {"message": "Facturas pagadas procesadas"}
+
+    @staticmethod
+    @webhook_registry.register("charge.succeeded", concurrency=4, batch_size=25, batch_window=0.2)
+    async def handle_charges_succeeded(batch: list[dict]):
+        """
+        Maneja lotes de eventos 'charge.succeeded'.
+        """
+        log_event(logging.INFO, "charge.succeeded", count=len(batch),
+                  ids=[data.get("id") for data in batch])
+        return {"message": "Cargos exitosos procesados"}
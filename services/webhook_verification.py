@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import time
+from typing import Any
+
+import stripe
+
+from core import fast_json
+from core.config import settings
+
+
+class WebhookVerifier:
+    """
+    Verificación de firma y decodificación de webhooks de Stripe sin construir objetos
+    ``StripeObject``; los payloads grandes se procesan en un hilo para no bloquear el
+    event loop.
+    """
+
+    @staticmethod
+    async def verify_and_parse(payload: bytes, sig_header: str, secret: str) -> dict[str, Any]:
+        """
+        Verifica la firma del webhook y decodifica el evento.
+
+        :param payload: Cuerpo crudo del webhook.
+        :param sig_header: Cabecera 'Stripe-Signature'.
+        :param secret: Clave secreta del endpoint del webhook.
+        :return: Evento decodificado como diccionario.
+        """
+        if len(payload) >= settings.WEBHOOK_OFFLOAD_BYTES:
+            return await asyncio.to_thread(
+                WebhookVerifier._verify_and_parse, payload, sig_header, secret
+            )
+        return WebhookVerifier._verify_and_parse(payload, sig_header, secret)
+
+    @staticmethod
+    def _verify_and_parse(payload: bytes, sig_header: str, secret: str) -> dict[str, Any]:
+        WebhookVerifier.verify_signature(payload, sig_header, secret)
+        try:
+            return fast_json.loads(payload)
+        except Exception as e:
+            raise ValueError("Payload inválido") from e
+
+    @staticmethod
+    def verify_signature(payload: bytes, sig_header: str, secret: str) -> None:
+        """
+        Verifica la firma 'v1' del webhook. Las comprobaciones baratas (formato de la cabecera
+        y tolerancia del timestamp) se hacen antes del HMAC y de cualquier decodificación.
+
+        :param payload: Cuerpo crudo del webhook.
+        :param sig_header: Cabecera 'Stripe-Signature'.
+        :param secret: Clave secreta del endpoint del webhook.
+        :raises stripe.error.SignatureVerificationError: Si la firma no es válida.
+        """
+        timestamp = None
+        signatures = []
+        for item in sig_header.split(","):
+            key, _, value = item.strip().partition("=")
+            if key == "t":
+                timestamp = value
+            elif key == "v1":
+                signatures.append(value)
+
+        if not timestamp or not timestamp.isdigit() or not signatures:
+            raise stripe.error.SignatureVerificationError(
+                "Cabecera de firma con formato inválido", sig_header, payload
+            )
+        if int(timestamp) < time.time() - settings.WEBHOOK_TOLERANCE_SECONDS:
+            raise stripe.error.SignatureVerificationError(
+                "Timestamp fuera de la tolerancia", sig_header, payload
+            )
+
+        expected = hmac.new(
+            secret.encode("utf-8"),
+            timestamp.encode("utf-8") + b"." + payload,
+            hashlib.sha256,
+        ).hexdigest()
+        if not any(hmac.compare_digest(expected, signature) for signature in signatures):
+            raise stripe.error.SignatureVerificationError(
+                "Firma de webhook inválida", sig_header, payload
+            )
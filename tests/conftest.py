@@ -0,0 +1,9 @@
+import os
+
+# Valores mínimos para que ``core.config.Settings`` cargue sin un archivo .env
+for name in (
+    "DATABASE_URL", "DATABASE_NAME", "PROJECT_NAME", "API_V1_STR", "SECRET_KEY", "ALGORITHM",
+    "JWT_SECRET_KEY", "JWT_REFRESH_SECRET_KEY", "STRIPE_SECRET_KEY", "STRIPE_PUBLISHABLE_KEY",
+    "STRIPE_WEBHOOK_SECRET", "FRONTEND_URL",
+):
+    os.environ.setdefault(name, "test")
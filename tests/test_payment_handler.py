@@ -0,0 +1,46 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.v1.handlers.payment_handler import payment_router
+from services import idempotency, payment_services
+
+PAYMENT = {"amount": 1000, "currency": "usd", "payment_method": "pm_card_visa"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+
+    async def call(resource, method, *args, idempotency_key=None, **params):
+        calls.append(idempotency_key)
+        return {"id": f"pi_{len(calls)}", "object": "payment_intent", "amount": params["amount"]}
+
+    monkeypatch.setattr(payment_services.StripeGateway, "call", call)
+    idempotency.response_cache.clear()
+    app = FastAPI()
+    app.include_router(payment_router)
+    client = TestClient(app)
+    client.calls = calls
+    return client
+
+
+def test_generated_idempotency_key_is_returned_and_replayable(client):
+    first = client.post("/payment-intent", json=PAYMENT)
+    key = first.headers["Idempotency-Key"]
+
+    assert first.status_code == 200
+    assert key and client.calls == [key]
+
+    replay = client.post("/payment-intent", json=PAYMENT, headers={"Idempotency-Key": key})
+
+    assert replay.headers["Idempotency-Key"] == key
+    assert replay.json() == first.json()
+    assert client.calls == [key]
+
+
+def test_client_idempotency_key_is_echoed(client):
+    response = client.post("/payment-intent", json=PAYMENT, headers={"Idempotency-Key": "k-1"})
+
+    assert response.headers["Idempotency-Key"] == "k-1"
+    assert client.calls == ["k-1"]
@@ -0,0 +1,31 @@
+import copy
+
+from stripe import StripeObject
+
+from core.projection import parse_fields, project
+
+
+def test_project_overlapping_paths_does_not_mutate_source():
+    obj = StripeObject.construct_from(
+        {"id": "prod_1", "name": "Plan", "metadata": {"tier": "pro", "x": "1"}}, "sk_test"
+    )
+    before = copy.deepcopy(dict(obj))
+
+    projected = project(obj, parse_fields("metadata,metadata.x", ()))
+
+    assert projected == {"metadata": {"tier": "pro", "x": "1"}}
+    assert projected["metadata"] is not obj["metadata"]
+    assert project(obj, parse_fields("metadata.x,metadata.missing", ())) == {
+        "metadata": {"x": "1", "missing": None}
+    }
+    assert dict(obj) == before
+    assert project(obj, parse_fields("*", ())) is obj
+
+
+def test_project_nested_paths_under_missing_parent():
+    obj = {"id": "price_1", "recurring": None}
+
+    assert project(obj, ("id", "recurring.interval")) == {
+        "id": "price_1", "recurring": {"interval": None}
+    }
+    assert obj == {"id": "price_1", "recurring": None}